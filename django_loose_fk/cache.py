@@ -0,0 +1,274 @@
+"""
+Caching of remotely fetched objects.
+
+The cache sits between :meth:`django_loose_fk.loaders.BaseLoader.load` and the
+actual network I/O in ``fetch_object``. It consists of an in-process LRU tier with a
+TTL and an optional tier backed by one of the Django ``CACHES``.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.utils.functional import LazyObject, empty
+
+from .utils import normalize_url
+
+SETTINGS_PREFIX = "LOOSE_FK_CACHE"
+
+KEY_PREFIX = "django-loose-fk"
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class CacheEntry(NamedTuple):
+    data: Dict[str, Any]
+    expires: float
+    etag: str = ""
+    last_modified: str = ""
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.expires > time.time()
+
+    @property
+    def can_revalidate(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class ResponseCache:
+    """
+    Cache JSON payloads of remote objects, keyed by normalized URL.
+
+    A ``maxsize`` of 0 disables the in-process tier, ``backend`` is the alias of a
+    configured Django cache. When neither is set, the cache is a no-op.
+
+    Entries with HTTP validators (``ETag``/``Last-Modified``) are kept for
+    ``stale_timeout`` seconds after they expired, so that loaders can revalidate
+    them with a conditional request instead of downloading them again.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        timeout: float = 300,
+        backend: Optional[str] = None,
+        stale_timeout: float = 86400,
+    ):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.backend = backend
+        self.stale_timeout = stale_timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} maxsize={self.maxsize} "
+            f"timeout={self.timeout} backend={self.backend!r}>"
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.maxsize) or bool(self.backend)
+
+    def _get_backend_key(self, key: str) -> str:
+        # URLs can contain characters or exceed lengths that some backends refuse
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{digest}"
+
+    def _is_usable(self, entry: CacheEntry) -> bool:
+        if entry.is_fresh:
+            return True
+        return entry.can_revalidate and (
+            entry.expires + self.stale_timeout > time.time()
+        )
+
+    def _get_local(self, key: str) -> Optional[CacheEntry]:
+        if not self.maxsize:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self._is_usable(entry):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _set_local(self, key: str, entry: CacheEntry) -> None:
+        if not self.maxsize:
+            return
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_entry(self, url: str) -> Optional[CacheEntry]:
+        """
+        Return the cache entry for ``url``, which may be stale but revalidatable.
+
+        Only fresh entries count as a hit.
+        """
+        if not self.enabled:
+            return None
+
+        key = normalize_url(url)
+        entry = self._get_local(key)
+
+        if entry is None and self.backend:
+            entry = caches[self.backend].get(self._get_backend_key(key))
+            if entry is not None:
+                self._set_local(key, entry)
+
+        with self._lock:
+            if entry is not None and entry.is_fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached payload for ``url`` or ``None`` if it's not (or no longer)
+        cached.
+        """
+        entry = self.get_entry(url)
+        if entry is None or not entry.is_fresh:
+            return None
+        return entry.data
+
+    def set(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        etag: str = "",
+        last_modified: str = "",
+    ) -> None:
+        if not self.enabled:
+            return
+
+        key = normalize_url(url)
+        entry = CacheEntry(
+            data=data,
+            expires=time.time() + self.timeout,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._set_local(key, entry)
+        if self.backend:
+            timeout = self.timeout
+            if entry.can_revalidate:
+                timeout += self.stale_timeout
+            caches[self.backend].set(self._get_backend_key(key), entry, timeout=timeout)
+
+    def clear(self) -> None:
+        """
+        Clear the in-process tier and reset the counters.
+
+        Entries in the Django cache backend are left alone, they expire on their own.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            maxsize=self.maxsize,
+            currsize=len(self._entries),
+        )
+
+
+def get_cache_from_settings() -> ResponseCache:
+    return ResponseCache(
+        maxsize=getattr(settings, f"{SETTINGS_PREFIX}_MAXSIZE", 0),
+        timeout=getattr(settings, f"{SETTINGS_PREFIX}_TIMEOUT", 300),
+        backend=getattr(settings, f"{SETTINGS_PREFIX}_BACKEND", None),
+        stale_timeout=getattr(settings, f"{SETTINGS_PREFIX}_STALE_TIMEOUT", 86400),
+    )
+
+
+class DefaultResponseCache(LazyObject):
+    def __init__(self):
+        super().__init__()
+
+        setting_changed.connect(self._reset)
+
+    def _reset(self, setting, **kwargs):
+        if not setting.startswith(SETTINGS_PREFIX):
+            return  # noqa
+        self._wrapped = empty
+
+    def _setup(self):
+        self._wrapped = get_cache_from_settings()
+
+
+default_cache = DefaultResponseCache()
+
+
+class VerdictCache:
+    """
+    Remember the URLs that were verified to point to an existing object.
+
+    Used during validation, so that URLs submitted repeatedly are only checked once
+    every ``LOOSE_FK_VALIDATION_CACHE_TIMEOUT`` seconds.
+    """
+
+    maxsize = 4096
+
+    def __init__(self):
+        self._expires: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> float:
+        return getattr(settings, "LOOSE_FK_VALIDATION_CACHE_TIMEOUT", 0)
+
+    def __contains__(self, url: str) -> bool:
+        key = normalize_url(url)
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is None:
+                return False
+            if expires <= time.time():
+                del self._expires[key]
+                return False
+            return True
+
+    def add(self, url: str) -> None:
+        timeout = self.timeout
+        if not timeout:
+            return
+
+        key = normalize_url(url)
+        with self._lock:
+            self._expires[key] = time.time() + timeout
+            self._expires.move_to_end(key)
+            while len(self._expires) > self.maxsize:
+                self._expires.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires.clear()
+
+
+verdict_cache = VerdictCache()
@@ -5,27 +5,43 @@ Provides a custom field.
 """
 
 import logging
+import re
+import weakref
 from dataclasses import dataclass
-from typing import Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import ParseResult, urlparse
 
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.validators import URLValidator as _URLValidator
 from django.db import models
 from django.db.models.base import ModelBase
 from django.http import Http404
+from django.urls import NoReverseMatch
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import fields, serializers
+from rest_framework.relations import Hyperlink, HyperlinkedRelatedField
 from rest_framework.utils.model_meta import get_field_info
 
+from .cache import verdict_cache
 from .fields import FkOrURLField, InstanceOrUrl
 from .loaders import FetchError, FetchJsonError
-from .utils import get_resource_for_path, is_local
+from .utils import (
+    get_resource_for_path,
+    get_resources_for_paths,
+    is_local,
+    strip_port_number_and_lowercase,
+)
 
 logger = logging.getLogger(__name__)
 
+RESOLVERS_CONTEXT_KEY = "loose_fk_resolvers"
+
+# lookup values that reverse() puts in URLs as-is
+SAFE_URL_VALUE = re.compile(r"[A-Za-z0-9_.~-]+")
+
 
 # django tests use testserver host, but that doesn't pass core URLValidation
 # regex...
@@ -45,14 +61,106 @@ class Resolver:
     model: ModelBase
     field: FkOrURLField
 
+    def __post_init__(self):
+        # the objects resolved so far, by URL
+        self.resolved: Dict[str, models.Model] = {}
+        # the errors of remote URLs that failed to resolve in bulk, by URL
+        self.errors: Dict[str, Union[FetchError, FetchJsonError]] = {}
+
     def resolve(self, host: str, url: str) -> models.Model:
+        if url in self.resolved:
+            return self.resolved[url]
+        if url in self.errors:
+            raise self.errors[url]
+
         parsed = urlparse(url)
         local = is_local(host, url)
-        return self.resolve_local(parsed) if local else self.resolve_remote(url)
+        instance = self.resolve_local(parsed) if local else self.resolve_remote(url)
+        self.resolved[url] = instance
+        return instance
+
+    def is_trusted(self, url: str) -> bool:
+        trusted_hosts = getattr(settings, "LOOSE_FK_VALIDATION_TRUSTED_HOSTS", [])
+        host = strip_port_number_and_lowercase(urlparse(url).netloc)
+        return host in trusted_hosts
+
+    def fetches_remote(self, url: str) -> bool:
+        """
+        Check if validating the remote URL fetches the object.
+
+        It doesn't if the host is trusted or if the ``LOOSE_FK_VALIDATION_METHOD``
+        setting is ``"HEAD"``. This only depends on the settings, so that the
+        validated value is always of the same type.
+        """
+        if self.is_trusted(url):
+            return False
+        return getattr(settings, "LOOSE_FK_VALIDATION_METHOD", "GET") != "HEAD"
+
+    def validate(self, host: str, url: str) -> None:
+        """
+        Check that the URL points to an existing object.
+
+        Local objects are resolved. Remote objects are fetched, unless the host is
+        trusted or the loader checks if the object exists without fetching it (see
+        :meth:`fetches_remote`). Those checks are skipped if the URL was verified
+        recently (see ``verdict_cache``).
+        """
+        if url in self.resolved or url in self.errors or is_local(host, url):
+            self.resolve(host, url)
+            return
+        if self.fetches_remote(url):
+            self.resolve(host, url)
+            return
+        if self.is_trusted(url) or url in verdict_cache:
+            return
+
+        self.field.loader.check_object(url)
+        verdict_cache.add(url)
 
     def resolve_local(self, parsed: ParseResult) -> models.Model:
         return get_resource_for_path(parsed.path)
 
+    def prefetch(self, host: str, urls: List[str]) -> None:
+        """
+        Resolve the URLs in bulk ahead of their validation.
+
+        URLs that don't need to be resolved for validation are skipped. URLs that
+        fail to resolve are left for the validation to report, remote URLs are
+        fetched once and the errors of those that fail are kept for it.
+        """
+        local_urls, remote_urls = [], []
+        for url in dict.fromkeys(urls):
+            if url in self.resolved or url in self.errors:
+                continue
+            if is_local(host, url):
+                local_urls.append(url)
+            elif self.fetches_remote(url):
+                remote_urls.append(url)
+
+        local_objects = get_resources_for_paths(
+            (urlparse(url).path for url in local_urls), missing_ok=True
+        )
+        self.resolved.update(
+            (url, instance)
+            for url, instance in zip(local_urls, local_objects)
+            if instance is not None
+        )
+
+        remote_objects = self.resolve_remote_many(remote_urls, return_exceptions=True)
+        for url, instance in zip(remote_urls, remote_objects):
+            if isinstance(instance, Exception):
+                self.errors[url] = instance
+            else:
+                self.resolved[url] = instance
+
+    def resolve_remote_many(
+        self, urls: List[str], return_exceptions: bool = False
+    ) -> List[Union[models.Model, FetchError, FetchJsonError]]:
+        remote_model = self.field._fk_field.related_model
+        return self.field.loader.load_many(
+            urls, model=remote_model, return_exceptions=return_exceptions
+        )
+
     def resolve_remote(self, url: str) -> models.Model:
         # load the remote object
         instance = self.model(**{self.field.name: url})
@@ -85,7 +193,10 @@ class FKOrURLValidator:
             raise serializers.ValidationError(exc.message, code=self.code)
 
         model, field = serializer_field._get_model_and_field()
-        resolver = Resolver(model, field)
+        # prefetched by FKOrURLListSerializer
+        resolver = serializer_field.context.get(RESOLVERS_CONTEXT_KEY, {}).get(
+            serializer_field.field_name
+        ) or Resolver(model, field)
         host = serializer_field.context["request"].get_host()
         # added so that the field has access to the resolver
         # NOTE: this might be subject to the race condition mentioned in the DRF 3.11
@@ -93,7 +204,7 @@ class FKOrURLValidator:
         serializer_field.context["resolver"] = resolver
 
         try:
-            resolver.resolve(host, url)
+            resolver.validate(host, url)
         except FetchError as exc:  # remote resolution fails
             logger.info("Could not fetch %s: %r", url, exc, exc_info=exc)
             raise serializers.ValidationError(
@@ -116,6 +227,55 @@ class FKOrURLValidator:
             )
 
 
+class FKOrURLListSerializer(serializers.ListSerializer):
+    """
+    List serializer resolving the URLs of all items at once before validating them.
+
+    The URLs of the :class:`FKOrURLField` fields are resolved with a query per
+    viewset for local URLs and concurrently for remote URLs. Use it as
+    ``list_serializer_class`` in the ``Meta`` of the (child) serializer.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.prefetch_urls(data)
+        return super().to_internal_value(data)
+
+    def prefetch_urls(self, data: list) -> None:
+        host = self.context["request"].get_host()
+        url_validator = URLValidator()
+        resolvers = self.context.setdefault(RESOLVERS_CONTEXT_KEY, {})
+
+        for field_name, field in self.child.fields.items():
+            if not isinstance(field, FKOrURLField) or field.read_only:
+                continue
+
+            urls = []
+            for item in data:
+                url = item.get(field_name) if isinstance(item, dict) else None
+                if not url or not isinstance(url, str):
+                    continue
+                try:
+                    url_validator(url)
+                except DjangoValidationError:
+                    continue
+                urls.append(url)
+
+            if field_name not in resolvers:
+                resolvers[field_name] = Resolver(*field._get_model_and_field())
+            resolvers[field_name].prefetch(host, urls)
+
+
+# introspection results of the fields, by serializer class
+_introspection_cache: "weakref.WeakKeyDictionary[type, Dict[tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_introspection_cache(serializer_class: type) -> Dict[tuple, Any]:
+    return _introspection_cache.setdefault(serializer_class, {})
+
+
 class FKOrURLField(fields.CharField):
     """
     A serializer field for the database FKOrURLField field.
@@ -137,15 +297,32 @@ class FKOrURLField(fields.CharField):
         super().__init__(*args, **kwargs)
 
         self.validators += [FKOrURLValidator()]
+        # URL templates for the local objects, by request and format
+        self._url_templates: Dict[tuple, Tuple[str, str]] = {}
 
     @cached_property
     def _field_instance(self):
+        self.model_field = self._get_model_and_field()[1]
+        field_class, field_kwargs = self._get_field_class_and_kwargs()
+        _field = field_class(**field_kwargs)
+        _field.parent = self.parent
+        return _field
+
+    def _get_field_class_and_kwargs(self) -> Tuple[type, dict]:
+        """
+        Build the (hyperlinked) serializer field for the FK, once per serializer
+        class, field and extra kwargs of the field.
+        """
+        cache = get_introspection_cache(type(self.parent))
+        key = ("field_class_and_kwargs", self.field_name)
+        extra_field_kwargs = self.parent.get_extra_kwargs().get(self.field_name, {})
+        if key in cache and cache[key][0] == extra_field_kwargs:
+            return cache[key][1]
+
         model_class, model_field = self._get_model_and_field()
-        self.model_field = model_field
         info = get_field_info(model_class)
         fk_field_name = model_field.fk_field
 
-        extra_field_kwargs = self.parent.get_extra_kwargs().get(self.field_name, {})
         field_class, field_kwargs = self.parent.build_field(
             fk_field_name, info, model_class, 0
         )
@@ -155,28 +332,112 @@ class FKOrURLField(fields.CharField):
         field_kwargs.pop("max_length", None)
         field_kwargs.pop("min_length", None)
         field_kwargs.pop("allow_blank", None)
-        _field = field_class(**field_kwargs)
-        _field.parent = self.parent
-        return _field
+        cache[key] = (extra_field_kwargs, (field_class, field_kwargs))
+        return field_class, field_kwargs
+
+    @cached_property
+    def _model_and_field(self) -> Tuple[ModelBase, FkOrURLField]:
+        cache = get_introspection_cache(type(self.parent))
+        key = ("model_and_field", self.source)
+        if key not in cache:
+            model_class = self.parent.Meta.model
+            model_field = model_class._meta.get_field(self.source)
+            cache[key] = (model_class, model_field)
+        return cache[key]
 
     def _get_model_and_field(self) -> Tuple[ModelBase, FkOrURLField]:
-        model_class = self.parent.Meta.model
-        model_field = model_class._meta.get_field(self.source)
-        return (model_class, model_field)
+        return self._model_and_field
+
+    def _get_url_field(self) -> Optional[HyperlinkedRelatedField]:
+        """
+        Return the hyperlinked field for the FK if the URLs of local objects can be
+        formatted from a template, see the ``LOOSE_FK_URL_TEMPLATES`` setting.
+        """
+        if not getattr(settings, "LOOSE_FK_URL_TEMPLATES", False):
+            return None
+
+        field = self._field_instance
+        if not (
+            isinstance(field, HyperlinkedRelatedField)
+            and type(field).get_url is HyperlinkedRelatedField.get_url
+            and type(field).to_representation
+            is HyperlinkedRelatedField.to_representation
+        ):
+            return None
+        return field
+
+    def _get_local_url(self, lookup_value) -> Optional[str]:
+        """
+        Format the URL of a local object by substituting the lookup value in the
+        URL template for the request.
+
+        The template is made by reversing the URL once. ``None`` is returned if the
+        URL can't be formatted like ``reverse`` would.
+        """
+        url_field = self._field_instance
+        request = self.context.get("request")
+        lookup_value = str(lookup_value)
+        if request is None or not SAFE_URL_VALUE.fullmatch(lookup_value):
+            return None
+
+        format = self.context.get("format")
+        if format and url_field.format and url_field.format != format:
+            format = url_field.format
+
+        key = (request, format)
+        if key not in self._url_templates:
+            try:
+                url = url_field.reverse(
+                    url_field.view_name,
+                    kwargs={url_field.lookup_url_kwarg: lookup_value},
+                    request=request,
+                    format=format,
+                )
+            except NoReverseMatch:
+                return None
+            # the lookup value must be the only variable part of the URL
+            if url.count(lookup_value) != 1:
+                return url
+            prefix, _, suffix = url.partition(lookup_value)
+            self._url_templates[key] = (prefix, suffix)
+
+        prefix, suffix = self._url_templates[key]
+        return f"{prefix}{lookup_value}{suffix}"
 
     def get_attribute(self, instance: models.Model) -> InstanceOrUrl:
         """
         Optimize fetching the attribute in case it's a remote URL.
 
         This prevents using the remote fetcher/importer to do network IO when
-        it's not needed.
+        it's not needed. With URL templates, the URL of a local object is made from
+        the FK value, without loading the object.
         """
         model_field = self._get_model_and_field()[1]
         url_value = getattr(instance, model_field.url_field)
         if url_value:
             return url_value
+
+        fk_field = model_field._fk_field
+        fk_value = getattr(instance, fk_field.attname, None)
+        if fk_value is not None and self._lookup_is_fk_value():
+            url = self._get_local_url(fk_value)
+            if url is not None:
+                return url
         return super().get_attribute(instance)
 
+    def _lookup_is_fk_value(self) -> bool:
+        """
+        Check if local objects are looked up in their URL by the value of the FK.
+        """
+        url_field = self._get_url_field()
+        if url_field is None:
+            return False
+        target_field = self._get_model_and_field()[1]._fk_field.target_field
+        target_names = {target_field.name, target_field.attname}
+        if target_field.primary_key:
+            target_names.add("pk")
+        return url_field.lookup_field in target_names
+
     def run_validation(self, *args, **kwargs) -> Union[models.Model, None]:
         url = super().run_validation(*args, **kwargs)
 
@@ -184,9 +445,12 @@ class FKOrURLField(fields.CharField):
             # see rest_framework.fields.Field.validate_empty_values
             return None
 
-        host = self.context["request"].get_host()
         resolver = self.context["resolver"]
-        return resolver.resolve(host, url)
+        if url not in resolver.resolved:
+            # the remote object was validated without fetching it, see
+            # Resolver.fetches_remote
+            return url
+        return resolver.resolved[url]
 
     def to_representation(self, value: InstanceOrUrl) -> str:
         if isinstance(value, str):
@@ -195,6 +459,11 @@ class FKOrURLField(fields.CharField):
         # check if it's a local FK, in that case, use the HyperlinkedRelatedField
         # to serialize the value
         if value.pk is not None:
+            url_field = self._get_url_field()
+            if url_field is not None:
+                url = self._get_local_url(getattr(value, url_field.lookup_field))
+                if url is not None:
+                    return Hyperlink(url, value)
             return self._field_instance.to_representation(value)
         else:
             # TODO: this breaks if there is no serializer instance, but just
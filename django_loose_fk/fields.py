@@ -7,8 +7,12 @@ from django.db.models import Field
 from django.db.models.base import ModelBase, Options
 from django.utils.functional import cached_property
 
+from asgiref.sync import sync_to_async
+
 from .constraints import FkOrURLFieldConstraint
+from .indexes import FkOrURLFieldIndex
 from .loaders import BaseLoader, default_loader
+from .utils import get_url_digest
 from .virtual_models import ProxyMixin
 
 InstanceOrUrl = Union[models.Model, str]
@@ -24,6 +28,8 @@ class FkOrURLField(models.Field):
     help_text: Optional[str] = ""
 
     loader: BaseLoader = default_loader
+    url_hash_field: Optional[str] = None
+    index_url: bool = False
 
     name = None
 
@@ -75,6 +81,11 @@ class FkOrURLField(models.Field):
 
         cls._meta.add_field(self)
         self._add_check_constraint(cls._meta)
+        if self.index_url:
+            self._add_url_index(cls._meta)
+
+        if self.url_hash_field and cls.__module__ != "__fake__":
+            models.signals.pre_save.connect(self._sync_url_hash, sender=cls, weak=False)
 
         # install the descriptor
         setattr(cls, self.name, FkOrURLDescriptor(self))
@@ -107,6 +118,26 @@ class FkOrURLField(models.Field):
             options.original_attrs["constraints"] = options.constraints
         return
 
+    def _add_url_index(self, options: Options) -> None:
+        """
+        Create the index on the URL field and add it if it's not present yet.
+        """
+        # during migrations, the indexes are part of the model state already
+        if self.model.__module__ == "__fake__":
+            return
+
+        if any(
+            isinstance(index, FkOrURLFieldIndex) and index.url_field == self.url_field
+            for index in options.indexes
+        ):
+            return
+
+        # the name is set by the model metaclass, like for other unnamed indexes
+        options.indexes.append(FkOrURLFieldIndex(url_field=self.url_field))
+        # ensure this can be picked up by migrations by making it "explicitly defined"
+        if "indexes" not in options.original_attrs:
+            options.original_attrs["indexes"] = options.indexes
+
     @cached_property
     def _fk_field(self) -> models.ForeignKey:
         # get the actual fields - uses private API because the app registry isn't
@@ -123,6 +154,34 @@ class FkOrURLField(models.Field):
         _fields = {field.name: field for field in self.model._meta.fields}
         return _fields[self.url_field]
 
+    @cached_property
+    def _url_hash_field(self) -> Optional[models.Field]:
+        if not self.url_hash_field:
+            return None
+        _fields = {field.name: field for field in self.model._meta.fields}
+        return _fields[self.url_hash_field]
+
+    def get_url_hash(self, url: str) -> Union[None, int, str]:
+        """
+        Calculate the value of the ``url_hash_field`` for a URL.
+
+        Integer fields get the first 64 bits of the sha256 digest of the normalized
+        URL as signed integer, character fields the hex representation.
+        """
+        if not url:
+            return None
+        digest = get_url_digest(url)
+        if isinstance(self._url_hash_field, models.BigIntegerField):
+            return int.from_bytes(digest[:8], "big", signed=True)
+        return digest.hex()
+
+    def sync_url_hash(self, instance: models.Model) -> None:
+        url = getattr(instance, self.url_field)
+        setattr(instance, self._url_hash_field.attname, self.get_url_hash(url))
+
+    def _sync_url_hash(self, sender, instance: models.Model, **kwargs) -> None:
+        self.sync_url_hash(instance)
+
     def check(self, **kwargs) -> List[checks.Error]:
         errors = []
         if not isinstance(self._fk_field, models.ForeignKey):
@@ -151,8 +210,52 @@ class FkOrURLField(models.Field):
                 )
             )
 
+        if self.url_hash_field:
+            errors += self._check_url_hash_field()
+
         return errors
 
+    def _check_url_hash_field(self) -> List[checks.Error]:
+        _fields = {field.name: field for field in self.model._meta.fields}
+        hash_field = _fields.get(self.url_hash_field)
+        is_valid = isinstance(hash_field, models.BigIntegerField) or (
+            isinstance(hash_field, models.CharField)
+            and (hash_field.max_length or 0) >= 64
+        )
+        if not is_valid:
+            return [
+                checks.Error(
+                    "The field passed to 'url_hash_field' should be a "
+                    "BigIntegerField or a CharField with a max_length of at least 64",
+                    obj=self,
+                    id="fk_or_url_field.E004",
+                )
+            ]
+
+        if not hash_field.null:
+            return [
+                checks.Error(
+                    f"The field '{self.url_hash_field}' must be nullable",
+                    obj=self,
+                    id="fk_or_url_field.E005",
+                )
+            ]
+        return []
+
+    def get_cached_object(self, instance: models.Model, url: str) -> models.Model:
+        """
+        Return the object previously loaded for ``url`` on ``instance``, if any.
+        """
+        cached = instance._state.fields_cache.get(self.name)
+        if cached is None or cached[0] != url:
+            return None
+        return cached[1]
+
+    def set_cached_object(
+        self, instance: models.Model, url: str, value: models.Model
+    ) -> None:
+        instance._state.fields_cache[self.name] = (url, value)
+
     @property
     def attname(self) -> str:
         return self.name
@@ -176,6 +279,10 @@ class FkOrURLField(models.Field):
             "blank": self.blank,
             "null": self.null,
         }
+        if self.url_hash_field:
+            keywords["url_hash_field"] = self.url_hash_field
+        if self.index_url:
+            keywords["index_url"] = True
         return (self.name, path, [], keywords)
 
     @property
@@ -221,9 +328,51 @@ class FkOrURLDescriptor:
                 raise ValueError("No FK value and no URL value, this is not allowed!")
             return None
 
+        # loaded before or prefetched - the cache is keyed by the URL so that it's
+        # invalidated when the URL value changes
+        cached = self.field.get_cached_object(instance, url_value)
+        if cached is not None:
+            return cached
+
         remote_model = self.field._fk_field.related_model
         remote_loader = self.field.loader
-        return remote_loader.load(url=url_value, model=remote_model)
+        value = remote_loader.load(url=url_value, model=remote_model)
+        self.field.set_cached_object(instance, url_value, value)
+        return value
+
+    async def aget(self, instance: models.Model) -> Optional[models.Model]:
+        """
+        Async counterpart of ``__get__``, remote objects are loaded with
+        :meth:`django_loose_fk.loaders.BaseLoader.aload`.
+        """
+        if isinstance(instance, ProxyMixin):
+            fk_value = instance._loose_fk_data.get(self.fk_field_name, None)
+            if fk_value:
+                return fk_value
+
+        fk_field = self.field._fk_field
+        if getattr(instance, fk_field.attname) is not None:
+            if fk_field.is_cached(instance):
+                fk_value = fk_field.get_cached_value(instance)
+            else:
+                fk_value = await sync_to_async(getattr)(instance, self.fk_field_name)
+            if fk_value is not None:
+                return fk_value
+
+        url_value = getattr(instance, self.url_field_name)
+        if not url_value:
+            if not self.field.null:
+                raise ValueError("No FK value and no URL value, this is not allowed!")
+            return None
+
+        cached = self.field.get_cached_object(instance, url_value)
+        if cached is not None:
+            return cached
+
+        remote_model = fk_field.related_model
+        value = await self.field.loader.aload(url=url_value, model=remote_model)
+        self.field.set_cached_object(instance, url_value, value)
+        return value
 
     def __set__(self, instance: models.Model, value: Optional[InstanceOrUrl]):
         """
@@ -254,7 +403,23 @@ class FkOrURLDescriptor:
         elif value is None:
             setattr(instance, self.url_field_name, "")
             setattr(instance, self.fk_field_name, None)
-            return
         else:
             raise TypeError(f"value is of type {type(value)}, which is not supported.")
-        setattr(instance, field_name, value)
+
+        if value is not None:
+            setattr(instance, field_name, value)
+        if self.field.url_hash_field:
+            self.field.sync_url_hash(instance)
+
+
+async def aget_related(instance: models.Model, field_name: str):
+    """
+    Async counterpart of ``getattr(instance, field_name)`` for loose-fk fields and
+    the relations of virtual models.
+
+    Multiple values can be resolved concurrently with ``asyncio.gather``.
+    """
+    descriptor = getattr(type(instance), field_name)
+    if hasattr(descriptor, "aget"):
+        return await descriptor.aget(instance)
+    return await sync_to_async(getattr)(instance, field_name)
@@ -12,7 +12,7 @@ import django_filters
 from django_filters.filterset import FilterSet, remote_queryset as _remote_queryset
 
 from .fields import FkOrURLField
-from .utils import get_resource_for_path, get_subclasses, is_local
+from .utils import get_resources_for_paths, get_subclasses, is_local
 
 logger = logging.getLogger(__name__)
 
@@ -88,11 +88,21 @@ class FkOrUrlFieldFilter(django_filters.CharFilter):
             local_filter_key = model_field_path + local_filter_key
             external_filter_key = model_field_path + external_filter_key
 
+        local_values = [
+            value for value in parsed_values if is_local(host, value.geturl())
+        ]
+        # resolve all local objects at once, with a query per viewset
+        local_objects = dict(
+            zip(
+                local_values,
+                get_resources_for_paths(value.path for value in local_values),
+            )
+        )
+
         filters = {}
         for value in parsed_values:
-            local = is_local(host, value.geturl())
-            if local:
-                local_object = get_resource_for_path(value.path)
+            if value in local_objects:
+                local_object = local_objects[value]
                 if self.instance_path:
                     for bit in self.instance_path.split("."):
                         local_object = getattr(local_object, bit)
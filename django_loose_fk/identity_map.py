@@ -0,0 +1,75 @@
+"""
+Request-scoped identity map for loaded loose-fk objects.
+
+Within an identity map scope, every URL is loaded at most once per model - repeated
+access returns the very same instance without any further I/O. Scopes are opened
+with the :func:`identity_map` context manager (which also works as a decorator, e.g.
+for Celery tasks) or for every HTTP request by
+:class:`django_loose_fk.middleware.IdentityMapMiddleware`.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+from django.db import models
+from django.db.models.base import ModelBase
+
+from .utils import normalize_url
+
+_current_identity_map: ContextVar[Optional["IdentityMap"]] = ContextVar(
+    "loose_fk_identity_map", default=None
+)
+
+
+class IdentityMap:
+    def __init__(self):
+        self._objects: Dict[Tuple[ModelBase, str], models.Model] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} size={len(self)}>"
+
+    def get(self, url: str, model: ModelBase) -> Optional[models.Model]:
+        return self._objects.get((model, normalize_url(url)))
+
+    def add(self, url: str, model: ModelBase, instance: models.Model) -> models.Model:
+        """
+        Register the loaded instance and return the instance registered for the URL.
+        """
+        with self._lock:
+            return self._objects.setdefault((model, normalize_url(url)), instance)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._objects.clear()
+
+
+def get_identity_map() -> Optional[IdentityMap]:
+    """
+    Return the identity map of the current scope, if any.
+    """
+    return _current_identity_map.get()
+
+
+@contextmanager
+def identity_map() -> Iterator[IdentityMap]:
+    """
+    Open an identity map scope.
+
+    Nested scopes share the identity map of the outermost scope.
+    """
+    current = _current_identity_map.get()
+    if current is not None:
+        yield current
+        return
+
+    token = _current_identity_map.set(IdentityMap())
+    try:
+        yield _current_identity_map.get()
+    finally:
+        _current_identity_map.reset(token)
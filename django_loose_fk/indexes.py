@@ -0,0 +1,37 @@
+from django.db import models
+
+
+class FkOrURLFieldIndex(models.Index):
+    """
+    Index the URL field of a loose-fk field.
+
+    On databases supporting partial indexes, only the rows with a URL are indexed.
+    """
+
+    def __init__(self, url_field: str, name: str = ""):
+        self.url_field = url_field
+        super().__init__(fields=[url_field], name=name)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        del kwargs["fields"]
+        kwargs["url_field"] = self.url_field
+        return (path, args, kwargs)
+
+    def _get_index(self, schema_editor) -> models.Index:
+        """
+        Return the underlying index, partial if the database supports it.
+        """
+        condition = None
+        if schema_editor.connection.features.supports_partial_indexes:
+            condition = ~models.Q(**{self.url_field: ""})
+        return models.Index(fields=self.fields, name=self.name, condition=condition)
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        index = self._get_index(schema_editor)
+        return index.create_sql(model, schema_editor, using=using, **kwargs)
+
+    def __repr__(self):
+        return "<{}: url_field={!r} name={!r}>".format(
+            self.__class__.__name__, self.url_field, self.name
+        )
@@ -1,21 +1,33 @@
+import asyncio
 import json
-import warnings
-from typing import Type
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Type, Union
 from urllib.parse import urlparse
 
 from django.conf import settings
 from django.core.signals import setting_changed
 from django.db import models
 from django.db.models.base import ModelBase
-from django.http.request import validate_host
-from django.utils.functional import LazyObject, empty
+from django.utils.functional import LazyObject, cached_property, empty
 from django.utils.module_loading import import_string
 
-from .utils import get_resource_for_path, strip_port_number_and_lowercase
-from .virtual_models import get_model_instance
+from asgiref.sync import async_to_sync, sync_to_async
+
+from .cache import ResponseCache, default_cache
+from .identity_map import get_identity_map
+from .utils import get_resource_for_path, get_resources_for_paths, local_url_classifier
+from .virtual_models import get_model_instance, get_model_instances
 
 SETTING = "DEFAULT_LOOSE_FK_LOADER"
 
+REQUESTS_SETTINGS_PREFIX = "LOOSE_FK_REQUESTS"
+
+# the httpx loader and its async client of the aload_many call being run
+_current_async_client = ContextVar("loose_fk_async_client", default=(None, None))
+
 
 class FetchError(Exception):
     pass
@@ -26,6 +38,13 @@ class FetchJsonError(Exception):
 
 
 class BaseLoader:
+    # the default, for subclasses that don't call super().__init__()
+    cache: ResponseCache = default_cache
+
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        if cache is not None:
+            self.cache = cache
+
     @staticmethod
     def fetch_object(url: str):
         raise NotImplementedError  # noqa
@@ -42,54 +61,459 @@ class BaseLoader:
 
         Validation if a URL is local is done by looking at the host and
         comparing it against the ALLOWED_HOSTS setting, as Django serves
-        those domains.
+        those domains, or against the LOOSE_FK_LOCAL_BASE_URLS setting if it's set.
         """
-        allowed_hosts = settings.ALLOWED_HOSTS
+        return local_url_classifier.is_local_url(url)
+
+    def load_local_object(self, url: str, model: ModelBase) -> models.Model:
         parsed = urlparse(url)
-        local_base_urls = getattr(settings, "LOOSE_FK_LOCAL_BASE_URLS", [])
-
-        if any(pattern == "*" for pattern in allowed_hosts):
-            warnings.warn(
-                "You have wildcards in your ALLOWED_HOSTS setting - "
-                "this will cause all remote URLs to be considered local URLs and "
-                "break django-loose-fk's behaviour. You should use an explicit list.",
-                RuntimeWarning,
-            )
-            return validate_host(
-                strip_port_number_and_lowercase(parsed.netloc), allowed_hosts
-            )
+        return get_resource_for_path(parsed.path)
 
-        if local_base_urls:
-            return any(url.startswith(base_url) for base_url in local_base_urls)
+    def load_local_objects(
+        self, urls: List[str], model: ModelBase
+    ) -> List[models.Model]:
+        """
+        Load multiple local objects, with a single query per viewset.
+
+        If a subclass overrides :meth:`load_local_object`, that's used for every URL
+        instead.
+        """
+        if type(self).load_local_object is not BaseLoader.load_local_object:
+            return [self.load_local_object(url, model) for url in urls]
+        return get_resources_for_paths(urlparse(url).path for url in urls)
+
+    def fetch_cached_object(self, url: str) -> dict:
+        """
+        Fetch the remote object, going through the response cache.
 
-        return validate_host(
-            strip_port_number_and_lowercase(parsed.netloc), allowed_hosts
+        Failed fetches are never cached.
+        """
+        data = self.cache.get(url)
+        if data is None:
+            data = self.fetch_object(url)
+            self.cache.set(url, data)
+        return data
+
+    def check_object(self, url: str) -> None:
+        """
+        Check that the remote object exists, raising ``FetchError`` if it doesn't.
+
+        Loaders that can't check this more cheaply fetch the object.
+        """
+        self.fetch_cached_object(url)
+
+    def _fetch_cached_object_or_error(
+        self, url: str
+    ) -> Union[dict, FetchError, FetchJsonError]:
+        try:
+            return self.fetch_cached_object(url)
+        except (FetchError, FetchJsonError) as exc:
+            return exc
+
+    def fetch_cached_objects(
+        self, urls: List[str], return_exceptions: bool = False
+    ) -> List[Union[dict, FetchError, FetchJsonError]]:
+        """
+        Fetch multiple remote objects concurrently, preserving the order of ``urls``.
+
+        The number of concurrent fetches is limited by the
+        ``LOOSE_FK_FETCH_CONCURRENCY`` setting. If any fetch fails, the error of the
+        first failing URL is raised, or with ``return_exceptions`` the ``FetchError``
+        or ``FetchJsonError`` is returned in place of the data of that URL.
+        """
+        fetch = (
+            self._fetch_cached_object_or_error
+            if return_exceptions
+            else self.fetch_cached_object
         )
+        max_workers = getattr(settings, "LOOSE_FK_FETCH_CONCURRENCY", 8)
+        if len(urls) <= 1 or max_workers <= 1:
+            return [fetch(url) for url in urls]
 
-    def load_local_object(self, url: str, model: ModelBase) -> models.Model:
-        parsed = urlparse(url)
-        return get_resource_for_path(parsed.path)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            return list(executor.map(fetch, urls))
+
+    def load_many(
+        self, urls: Iterable[str], model: ModelBase, return_exceptions: bool = False
+    ) -> List[Union[models.Model, FetchError, FetchJsonError]]:
+        """
+        Load multiple URLs, fetching the remote ones concurrently.
+
+        Every distinct URL is loaded once, the result has the same order as ``urls``.
+        With ``return_exceptions``, remote URLs that fail to load don't affect the
+        others, their ``FetchError`` or ``FetchJsonError`` is returned in their place.
+        """
+        urls = list(urls)
+        identity_map = get_identity_map()
+
+        loaded, local_urls, remote_urls = {}, [], []
+        for url in dict.fromkeys(urls):
+            instance = (
+                identity_map.get(url, model) if identity_map is not None else None
+            )
+            if instance is not None:
+                loaded[url] = instance
+            elif self.is_local_url(url):
+                local_urls.append(url)
+            else:
+                remote_urls.append(url)
+
+        if local_urls:
+            loaded.update(zip(local_urls, self.load_local_objects(local_urls, model)))
+
+        remote_data = self.fetch_cached_objects(
+            remote_urls, return_exceptions=return_exceptions
+        )
+        errors, fetched_urls, fetched_data = {}, [], []
+        for url, data in zip(remote_urls, remote_data):
+            if isinstance(data, Exception):
+                errors[url] = data
+            else:
+                fetched_urls.append(url)
+                fetched_data.append(data)
+        loaded.update(
+            zip(fetched_urls, get_model_instances(model, fetched_data, loader=self))
+        )
+
+        if identity_map is not None:
+            loaded = {
+                url: identity_map.add(url, model, instance)
+                for url, instance in loaded.items()
+            }
+        loaded.update(errors)
+        return [loaded[url] for url in urls]
 
     def load(self, url: str, model: ModelBase) -> models.Model:
+        identity_map = get_identity_map()
+        if identity_map is not None:
+            instance = identity_map.get(url, model)
+            if instance is not None:
+                return instance
+
+        if self.is_local_url(url):
+            instance = self.load_local_object(url, model)
+        else:
+            # TODO: use a serializer layer in between
+            data = self.fetch_cached_object(url)
+            instance = get_model_instance(model, data, loader=self)
+
+        if identity_map is not None:
+            instance = identity_map.add(url, model, instance)
+        return instance
+
+    async def afetch_object(self, url: str) -> dict:
+        """
+        Fetch the remote object without blocking the event loop.
+
+        Loaders that are not natively async run :meth:`fetch_object` in a thread.
+        """
+        return await sync_to_async(self.fetch_object, thread_sensitive=False)(url)
+
+    async def afetch_cached_object(self, url: str) -> dict:
+        """
+        Async counterpart of :meth:`fetch_cached_object`.
+
+        Loaders that are not natively async run :meth:`fetch_cached_object` in a
+        thread, so that they revalidate the cache entries like they do when fetching
+        synchronously.
+        """
+        return await sync_to_async(self.fetch_cached_object, thread_sensitive=False)(
+            url
+        )
+
+    async def aload(self, url: str, model: ModelBase) -> models.Model:
+        """
+        Async counterpart of :meth:`load`.
+        """
+        identity_map = get_identity_map()
+        if identity_map is not None:
+            instance = identity_map.get(url, model)
+            if instance is not None:
+                return instance
+
         if self.is_local_url(url):
-            return self.load_local_object(url, model)
+            instance = await sync_to_async(self.load_local_object)(url, model)
+        else:
+            data = await self.afetch_cached_object(url)
+            # chained loose-fk URLs in the data may be resolved with a query
+            instance = await sync_to_async(get_model_instance)(
+                model, data, loader=self
+            )
+
+        if identity_map is not None:
+            instance = identity_map.add(url, model, instance)
+        return instance
+
+    async def aload_many(
+        self, urls: Iterable[str], model: ModelBase
+    ) -> List[models.Model]:
+        """
+        Async counterpart of :meth:`load_many`.
+
+        The URLs are loaded concurrently, limited by ``LOOSE_FK_FETCH_CONCURRENCY``.
+        """
+        urls = list(urls)
+        semaphore = asyncio.Semaphore(
+            max(getattr(settings, "LOOSE_FK_FETCH_CONCURRENCY", 8), 1)
+        )
+
+        async def _load(url: str) -> models.Model:
+            async with semaphore:
+                return await self.aload(url, model)
+
+        distinct_urls = list(dict.fromkeys(urls))
+        loaded = await asyncio.gather(*[_load(url) for url in distinct_urls])
+        loaded_by_url = dict(zip(distinct_urls, loaded))
+        return [loaded_by_url[url] for url in urls]
 
-        # TODO: use a serializer layer in between
-        data = self.fetch_object(url)
-        return get_model_instance(model, data, loader=self)
+
+class AsyncBaseLoader(BaseLoader):
+    """
+    Base class for loaders that fetch remote objects natively with asyncio.
+
+    Subclasses implement :meth:`afetch_object`, synchronous code paths run it in an
+    event loop through ``async_to_sync``.
+    """
+
+    async def afetch_object(self, url: str) -> dict:
+        raise NotImplementedError  # noqa
+
+    def fetch_object(self, url: str) -> dict:
+        return async_to_sync(self.afetch_object)(url)
+
+    async def afetch_cached_object(self, url: str) -> dict:
+        data = self.cache.get(url)
+        if data is None:
+            data = await self.afetch_object(url)
+            self.cache.set(url, data)
+        return data
 
 
 class RequestsLoader(BaseLoader):
+    """
+    Fetch remote objects with ``requests``.
+
+    Every thread gets a session of its own, as sessions aren't thread-safe. The
+    sessions share an adapter, so that connections are pooled and kept alive per
+    host for all fetches of the loader. The pool size, retries and timeouts are taken
+    from the ``LOOSE_FK_REQUESTS_*`` settings.
+    """
+
+    @cached_property
+    def _local(self) -> threading.local:
+        return threading.local()
+
+    @property
+    def timeout(self) -> Union[float, Tuple[float, float]]:
+        return getattr(settings, f"{REQUESTS_SETTINGS_PREFIX}_TIMEOUT", (5, 30))
+
+    @cached_property
+    def adapter(self):
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retries = Retry(
+            total=getattr(settings, f"{REQUESTS_SETTINGS_PREFIX}_RETRIES", 0),
+            backoff_factor=getattr(
+                settings, f"{REQUESTS_SETTINGS_PREFIX}_BACKOFF_FACTOR", 0.5
+            ),
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            # let raise_for_status deal with the last response
+            raise_on_status=False,
+        )
+        pool_size = getattr(settings, f"{REQUESTS_SETTINGS_PREFIX}_POOL_SIZE", 10)
+        return HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries
+        )
+
+    @property
+    def session(self):
+        """
+        Return the session of the current thread.
+        """
+        import requests
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            self._local.session = session
+        return session
+
+    def _get(self, url: str, headers: Optional[dict] = None):
+        import requests
+
+        try:
+            return self.session.get(url, headers=headers, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            raise FetchError(str(exc)) from exc
+
     @staticmethod
-    def fetch_object(url: str) -> dict:
+    def _get_data(response) -> dict:
+        import requests
+
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as exc:
+            raise FetchError(exc.args[0]) from exc
+
+        try:
+            data = response.json()
+        except json.JSONDecodeError as exc:
+            raise FetchJsonError(exc.args[0]) from exc
+
+        return data
+
+    def fetch_object(self, url: str) -> dict:
+        return self._get_data(self._get(url))
+
+    def check_object(self, url: str) -> None:
+        """
+        Check that the remote object exists with a ``HEAD`` request, unless it's
+        cached already.
+
+        Subclasses that override :meth:`fetch_object`, e.g. to authenticate, fetch
+        the object instead.
+        """
         import requests
 
-        response = requests.get(url)
+        if type(self).fetch_object is not RequestsLoader.fetch_object:
+            return super().check_object(url)
+        if self.cache.get(url) is not None:
+            return
+
         try:
+            response = self.session.head(
+                url, timeout=self.timeout, allow_redirects=True
+            )
             response.raise_for_status()
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            raise FetchError(str(exc)) from exc
         except requests.HTTPError as exc:
             raise FetchError(exc.args[0]) from exc
 
+    def fetch_cached_object(self, url: str) -> dict:
+        """
+        Fetch the remote object, revalidating stale cache entries.
+
+        The ``ETag`` and ``Last-Modified`` response headers are stored with the
+        payload. Once the entry expires, a conditional request is made and the
+        cached payload is reused if the server responds with ``304 Not Modified``.
+
+        Subclasses that override :meth:`fetch_object`, e.g. to authenticate, fetch
+        through it without revalidation.
+        """
+        if type(self).fetch_object is not RequestsLoader.fetch_object:
+            return super().fetch_cached_object(url)
+        if not self.cache.enabled:
+            return self.fetch_object(url)
+
+        entry = self.cache.get_entry(url)
+        if entry is not None and entry.is_fresh:
+            return entry.data
+
+        headers = {}
+        if entry is not None and entry.can_revalidate:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = self._get(url, headers=headers)
+        if headers and response.status_code == 304:
+            data = entry.data
+            etag = response.headers.get("ETag", entry.etag)
+            last_modified = response.headers.get("Last-Modified", entry.last_modified)
+        else:
+            data = self._get_data(response)
+            etag = response.headers.get("ETag", "")
+            last_modified = response.headers.get("Last-Modified", "")
+
+        self.cache.set(url, data, etag=etag, last_modified=last_modified)
+        return data
+
+
+class HttpxLoader(AsyncBaseLoader):
+    """
+    Fetch remote objects with ``httpx``, natively async.
+
+    Requires httpx, which can be installed as the [async] optional group dependency.
+    The ``LOOSE_FK_REQUESTS_TIMEOUT`` and ``LOOSE_FK_REQUESTS_POOL_SIZE`` settings
+    apply. A custom ``transport`` can be passed, e.g. ``httpx.MockTransport`` in
+    tests.
+
+    Async clients are bound to the event loop they're created in, so they're not
+    kept around: ``aload_many`` shares a client between its fetches and other async
+    fetches use a client of their own, which is closed afterwards.
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, transport=None):
+        super().__init__(cache=cache)
+        self.transport = transport
+
+    def _get_client_kwargs(self) -> dict:
+        import httpx
+
+        timeout = getattr(settings, f"{REQUESTS_SETTINGS_PREFIX}_TIMEOUT", (5, 30))
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+
+        pool_size = getattr(settings, f"{REQUESTS_SETTINGS_PREFIX}_POOL_SIZE", 10)
+        return {
+            "timeout": timeout,
+            "limits": httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+            "transport": self.transport,
+        }
+
+    @cached_property
+    def client(self):
+        import httpx
+
+        return httpx.Client(**self._get_client_kwargs())
+
+    def _create_async_client(self):
+        import httpx
+
+        return httpx.AsyncClient(**self._get_client_kwargs())
+
+    @asynccontextmanager
+    async def get_async_client(self) -> AsyncIterator:
+        """
+        Yield the async client of the ``aload_many`` call being run or a new client,
+        which is closed on exit.
+        """
+        loader, client = _current_async_client.get()
+        if loader is self:
+            yield client
+            return
+
+        async with self._create_async_client() as client:
+            yield client
+
+    async def aload_many(
+        self, urls: Iterable[str], model: ModelBase
+    ) -> List[models.Model]:
+        async with self._create_async_client() as client:
+            token = _current_async_client.set((self, client))
+            try:
+                return await super().aload_many(urls, model)
+            finally:
+                _current_async_client.reset(token)
+
+    @staticmethod
+    def _get_data(response) -> dict:
+        import httpx
+
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            raise FetchError(exc.args[0]) from exc
+
         try:
             data = response.json()
         except json.JSONDecodeError as exc:
@@ -97,6 +521,48 @@ class RequestsLoader(BaseLoader):
 
         return data
 
+    def fetch_object(self, url: str) -> dict:
+        import httpx
+
+        try:
+            response = self.client.get(url)
+        except httpx.TransportError as exc:
+            raise FetchError(str(exc)) from exc
+        return self._get_data(response)
+
+    def check_object(self, url: str) -> None:
+        """
+        Check that the remote object exists with a ``HEAD`` request, unless it's
+        cached already.
+
+        Subclasses that override :meth:`fetch_object`, e.g. to authenticate, fetch
+        the object instead.
+        """
+        import httpx
+
+        if type(self).fetch_object is not HttpxLoader.fetch_object:
+            return super().check_object(url)
+        if self.cache.get(url) is not None:
+            return
+
+        try:
+            response = self.client.head(url, follow_redirects=True)
+            response.raise_for_status()
+        except httpx.TransportError as exc:
+            raise FetchError(str(exc)) from exc
+        except httpx.HTTPStatusError as exc:
+            raise FetchError(exc.args[0]) from exc
+
+    async def afetch_object(self, url: str) -> dict:
+        import httpx
+
+        try:
+            async with self.get_async_client() as client:
+                response = await client.get(url)
+        except httpx.TransportError as exc:
+            raise FetchError(str(exc)) from exc
+        return self._get_data(response)
+
 
 def get_loader_class() -> Type[BaseLoader]:
     import_path = getattr(settings, SETTING, "django_loose_fk.loaders.RequestsLoader")
@@ -110,7 +576,7 @@ class DefaultLoader(LazyObject):
         setting_changed.connect(self._reset)
 
     def _reset(self, setting, **kwargs):
-        if setting != SETTING:
+        if setting != SETTING and not setting.startswith(REQUESTS_SETTINGS_PREFIX):
             return  # noqa
         self._wrapped = empty
 
@@ -1,11 +1,15 @@
-from typing import List, Tuple
+from typing import List, Tuple, Union
+from urllib.parse import urlparse
 
+from django.conf import settings
 from django.core.exceptions import EmptyResultSet
 from django.db import models
 from django.db.models.fields.related_lookups import RelatedIn
-from django.db.models.lookups import Exact as _Exact, In as _In
+from django.db.models.lookups import Exact as _Exact, In as _In, IsNull
+from django.db.models.sql.where import OR, WhereNode
 
 from .fields import FkOrURLField
+from .utils import get_lookup_values_for_paths
 from .virtual_models import ProxyMixin
 
 
@@ -21,6 +25,46 @@ def get_normalized_value(value) -> tuple:
     return value
 
 
+def resolve_local_urls(
+    target: FkOrURLField, values: list
+) -> Tuple[list, List[models.QuerySet]]:
+    """
+    Resolve the local URLs among ``values`` to FK values, without retrieving the
+    objects where possible.
+
+    Returns the FK values and the querysets of FK values to use as subquery.
+    """
+    local_urls = [
+        value
+        for value in values
+        if isinstance(value, str) and value and target.loader.is_local_url(value)
+    ]
+    if not local_urls:
+        return [], []
+
+    fk_field = target._fk_field
+    return get_lookup_values_for_paths(
+        (urlparse(url).path for url in local_urls), fk_field.target_field
+    )
+
+
+def get_url_hash_lookup(lookup: Union[_Exact, _In]) -> WhereNode:
+    """
+    Filter on the URL hash, keeping the rows without hash.
+
+    Rows can be saved without hash, e.g. with ``QuerySet.update()`` or before the
+    hash column was added. The URL itself is always compared as well.
+    """
+    return WhereNode([lookup, IsNull(lookup.lhs, True)], connector=OR)
+
+
+def get_local_fk_lookup(compiler, fk_lhs, rhs) -> WhereNode:
+    if isinstance(rhs, models.QuerySet):
+        rhs = rhs.query.resolve_expression(compiler.query)
+    # the NOT NULL check keeps exclude() from dropping the rows without FK value
+    return WhereNode([IsNull(fk_lhs, False), _In(fk_lhs, rhs)])
+
+
 class FkOrURLFieldMixin:
     def _split_lhs(
         self, compiler, connection, lhs=None
@@ -45,9 +89,16 @@ class Exact(FkOrURLFieldMixin, _Exact):
     The RHS is either a remote or local FK, which can be mapped directly.
     """
 
+    local_values = ()
+    local_querysets = ()
+
     def get_prep_lookup(self):
         if self.rhs_is_direct_value():
             self.rhs = get_normalized_value(self.rhs)[0]
+            # local URLs may be stored as FK or (e.g. for chained loose-fk) as URL
+            self.local_values, self.local_querysets = resolve_local_urls(
+                self.lhs.target, [self.rhs]
+            )
         return super().get_prep_lookup()
 
     def process_lhs(self, compiler, connection, lhs=None):
@@ -61,20 +112,52 @@ class Exact(FkOrURLFieldMixin, _Exact):
         else:
             return (fk_lhs_sql, fk_params)
 
+    def get_url_lookup(self) -> Union[_Exact, WhereNode]:
+        target = self.lhs.target
+        db_table = target.model._meta.db_table
+        url_lhs = target._url_field.get_col(db_table)
+        if not target.url_hash_field:
+            return _Exact(url_lhs, self.rhs)
+
+        # filter on the (indexed) hash first, the URL rules out collisions
+        hash_lhs = target._url_hash_field.get_col(db_table)
+        return WhereNode(
+            [
+                get_url_hash_lookup(_Exact(hash_lhs, target.get_url_hash(self.rhs))),
+                _Exact(url_lhs, self.rhs),
+            ]
+        )
+
+    def as_sql(self, compiler, connection):
+        target = self.lhs.target
+        if self.local_values or self.local_querysets:
+            fk_lhs = target._fk_field.get_col(target.model._meta.db_table)
+            lookups = [self.get_url_lookup()]
+            if self.local_values:
+                lookups.append(get_local_fk_lookup(compiler, fk_lhs, self.local_values))
+            for queryset in self.local_querysets:
+                lookups.append(get_local_fk_lookup(compiler, fk_lhs, queryset))
+            return compiler.compile(WhereNode(lookups, connector=OR))
+
+        if target.url_hash_field and isinstance(self.rhs, str) and self.rhs:
+            return compiler.compile(self.get_url_lookup())
+        return super().as_sql(compiler, connection)
+
 
 @FkOrURLField.register_lookup
-class In(FkOrURLFieldMixin, RelatedIn):
+class In(RelatedIn):
     """
     Split the IN query into two IN queries, per datatype.
 
     Creates an IN query for the url field values, and an IN query for the FK
-    field values, joined together by an OR.
+    field values, joined together by an OR. Both are regular ``In`` lookups, so
+    large lists are split in chunks according to
+    ``connection.ops.max_in_list_size()``.
     """
 
     lookup_name = "in"
 
-    def process_lhs(self, compiler, connection, lhs=None):
-        return self._split_lhs(compiler, connection, lhs=lhs)
+    local_querysets = ()
 
     def process_remote_rhs(self) -> List[str]:
         """
@@ -84,38 +167,14 @@ class In(FkOrURLFieldMixin, RelatedIn):
         """
         return [obj for obj in self.rhs if isinstance(obj, str)]
 
-    def process_rhs(self, compiler, connection):
-        if self.rhs_is_direct_value():
-            remote_rhs = self.process_remote_rhs()
-
-            if remote_rhs:
-                target = self.lhs.target
-                db_table = target.model._meta.db_table
-                url_lhs = target._url_field.get_col(db_table)
-                _remote_lookup = _In(url_lhs, remote_rhs)
-                url_rhs_sql, url_rhs_params = _remote_lookup.process_rhs(
-                    compiler, connection
-                )
-            else:
-                url_rhs_sql, url_rhs_params = None, ()
-
-            # filter out the remote objects
-            self.rhs = [obj for obj in self.rhs if obj not in remote_rhs]
-            if not self.rhs:
-                fk_rhs_sql, fk_rhs_params = None, ()
-            else:
-                fk_rhs_sql, fk_rhs_params = super().process_rhs(compiler, connection)
-        else:
-            # we're dealing with something that can be expressed as SQL -> it's local only!
-            url_rhs_sql, url_rhs_params = None, ()
-            fk_rhs_sql, fk_rhs_params = super().process_rhs(compiler, connection)
-
-        return url_rhs_sql, url_rhs_params, fk_rhs_sql, fk_rhs_params
-
     def get_prep_lookup(self):
         if self.rhs_is_direct_value():
             # If we get here, we are dealing with single-column relations.
             self.rhs = [get_normalized_value(val)[0] for val in self.rhs]
+            local_values, self.local_querysets = resolve_local_urls(
+                self.lhs.target, self.rhs
+            )
+            self.rhs += local_values
 
         else:
             # we're dealing with something that can be expressed as SQL -> it's local only!
@@ -126,39 +185,110 @@ class In(FkOrURLFieldMixin, RelatedIn):
             self.rhs.set_values([target_field])
         return super().get_prep_lookup()
 
-    def as_sql(self, compiler, connection):
-        # TODO: support connection.ops.max_in_list_size()
-        url_lhs_sql, url_params, fk_lhs_sql, fk_params = self.process_lhs(
-            compiler, connection
-        )
-        url_rhs_sql, url_rhs_params, fk_rhs_sql, fk_rhs_params = self.process_rhs(
-            compiler, connection
-        )
+    def get_lookups(self, compiler) -> List[Union[_In, WhereNode]]:
+        target = self.lhs.target
+        db_table = target.model._meta.db_table
+        url_lhs = target._url_field.get_col(db_table)
+        fk_lhs = target._fk_field.get_col(db_table)
 
-        if not fk_rhs_sql and not url_rhs_sql:
+        if not self.rhs_is_direct_value():
+            # we're dealing with something that can be expressed as SQL -> it's local only!
+            return [_In(fk_lhs, self.rhs)]
+
+        remote_rhs = self.process_remote_rhs()
+        local_rhs = [obj for obj in self.rhs if not isinstance(obj, str)]
+        lookups = []
+        if remote_rhs and target.url_hash_field:
+            # filter on the (indexed) hash first, the URL rules out collisions
+            hash_lhs = target._url_hash_field.get_col(db_table)
+            hashes = [target.get_url_hash(url) for url in remote_rhs]
+            hash_lookup = get_url_hash_lookup(_In(hash_lhs, hashes))
+            lookups.append(WhereNode([hash_lookup, _In(url_lhs, remote_rhs)]))
+        elif remote_rhs:
+            lookups.append(_In(url_lhs, remote_rhs))
+        if local_rhs:
+            lookups.append(_In(fk_lhs, local_rhs))
+        for queryset in self.local_querysets:
+            lookups.append(get_local_fk_lookup(compiler, fk_lhs, queryset))
+        return lookups
+
+    def as_sql(self, compiler, connection):
+        parts = []
+        for lookup in self.get_lookups(compiler):
+            try:
+                parts.append(compiler.compile(lookup))
+            except EmptyResultSet:
+                continue
+
+        if not parts:
             raise EmptyResultSet()
 
-        if fk_rhs_sql:
-            fk_rhs_sql = self.get_rhs_op(connection, fk_rhs_sql)
-            fk_sql = (
-                "{} {}".format(fk_lhs_sql, fk_rhs_sql),
-                tuple(fk_params) + fk_rhs_params,
-            )
+        if len(parts) == 1:
+            return parts[0]
 
-        if url_rhs_sql:
-            url_rhs_sql = self.get_rhs_op(connection, url_rhs_sql)
-            url_sql = (
-                "{} {}".format(url_lhs_sql, url_rhs_sql),
-                tuple(url_params) + url_rhs_params,
-            )
+        sql = "({})".format(" OR ".join(part_sql for part_sql, _ in parts))
+        params = tuple(param for _, part_params in parts for param in part_params)
+        return sql, params
 
-        if not fk_rhs_sql:
-            return url_sql
+    def as_postgresql(self, compiler, connection):
+        """
+        Compare against array parameters with the ``LOOSE_FK_POSTGRES_ARRAY_IN``
+        setting.
 
-        if not url_rhs_sql:
-            return fk_sql
+        The SQL is the same regardless of the number of values, which keeps the
+        number of parameters constant and allows grouping the statements in
+        ``pg_stat_statements``.
+        """
+        if not (
+            getattr(settings, "LOOSE_FK_POSTGRES_ARRAY_IN", False)
+            and self.rhs_is_direct_value()
+        ):
+            return self.as_sql(compiler, connection)
 
-        params = url_sql[1] + fk_sql[1]
-        sql = "({} OR {})".format(url_sql[0], fk_sql[0])
+        target = self.lhs.target
+        db_table = target.model._meta.db_table
+        url_lhs = target._url_field.get_col(db_table)
+        fk_lhs = target._fk_field.get_col(db_table)
 
-        return sql, params
+        remote_rhs = [obj for obj in self.process_remote_rhs() if obj]
+        local_rhs = [
+            obj for obj in self.rhs if obj is not None and not isinstance(obj, str)
+        ]
+        if not remote_rhs and not local_rhs:
+            raise EmptyResultSet()
+
+        def compile_any(lhs, values, db_type: str) -> Tuple[str, list]:
+            lookup = _In(lhs, values)
+            lhs_sql, lhs_params = lookup.process_lhs(compiler, connection)
+            rhs_params = ()
+            if values:
+                _, rhs_params = lookup.batch_process_rhs(compiler, connection)
+            return f"{lhs_sql} = ANY(%s::{db_type}[])", [*lhs_params, list(rhs_params)]
+
+        url_sql, params = compile_any(url_lhs, remote_rhs, "text")
+        if target.url_hash_field:
+            # filter on the (indexed) hash first, see get_url_hash_lookup
+            hash_lhs = target._url_hash_field.get_col(db_table)
+            hash_sql, hash_params = compile_any(
+                hash_lhs,
+                [target.get_url_hash(url) for url in remote_rhs],
+                hash_lhs.output_field.db_type(connection),
+            )
+            hash_null_sql, hash_null_params = compiler.compile(IsNull(hash_lhs, True))
+            url_sql = f"(({hash_sql} OR {hash_null_sql}) AND {url_sql})"
+            params = [*hash_params, *hash_null_params, *params]
+
+        fk_sql, fk_params = compile_any(
+            fk_lhs, local_rhs, fk_lhs.output_field.db_type(connection)
+        )
+        parts = [url_sql, fk_sql]
+        params += fk_params
+
+        for queryset in self.local_querysets:
+            sql, subquery_params = compiler.compile(
+                get_local_fk_lookup(compiler, fk_lhs, queryset)
+            )
+            parts.append(sql)
+            params += subquery_params
+
+        return "({})".format(" OR ".join(parts)), tuple(params)
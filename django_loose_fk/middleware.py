@@ -0,0 +1,14 @@
+from .identity_map import identity_map
+
+
+class IdentityMapMiddleware:
+    """
+    Load every loose-fk URL at most once during a request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map():
+            return self.get_response(request)
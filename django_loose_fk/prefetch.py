@@ -0,0 +1,96 @@
+"""
+Bulk loading of loose-fk values, the equivalent of ``prefetch_related``.
+"""
+
+from typing import Iterable
+
+from django.db import models
+from django.db.models.query import ModelIterable, prefetch_related_objects
+
+from .fields import FkOrURLField
+
+
+def prefetch_loose_fk(instances: Iterable[models.Model], *field_names: str) -> None:
+    """
+    Load the values of the given loose-fk fields for all instances in bulk.
+
+    Local FKs are loaded with a single query per field, the distinct URLs are loaded
+    concurrently through the loader of the field. The loaded objects are cached on
+    each instance, so that accessing the field doesn't do any further I/O. URLs that
+    fail to load are not cached, accessing the field raises the error.
+    """
+    instances = list(instances)
+    if not instances:
+        return
+
+    for field_name in field_names:
+        field = instances[0]._meta.get_field(field_name)
+        if not isinstance(field, FkOrURLField):
+            raise ValueError(f"'{field_name}' is not a FkOrURLField.")
+
+        fk_field = field._fk_field
+        local_instances = [
+            instance
+            for instance in instances
+            if getattr(instance, fk_field.attname) is not None
+        ]
+        prefetch_related_objects(local_instances, fk_field.name)
+
+        url_values = [
+            (instance, getattr(instance, field.url_field)) for instance in instances
+        ]
+        urls = list(dict.fromkeys(url for _, url in url_values if url))
+        if not urls:
+            continue
+
+        loaded = field.loader.load_many(
+            urls, model=fk_field.related_model, return_exceptions=True
+        )
+        loaded_by_url = {
+            url: value
+            for url, value in zip(urls, loaded)
+            if not isinstance(value, Exception)
+        }
+        for instance, url in url_values:
+            if url in loaded_by_url:
+                field.set_cached_object(instance, url, loaded_by_url[url])
+
+
+class LooseFkQuerySet(models.QuerySet):
+    """
+    Queryset supporting :meth:`prefetch_loose_fk`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prefetch_loose_fk_lookups = ()
+        self._prefetch_loose_fk_done = False
+
+    def prefetch_loose_fk(self, *field_names: str) -> "LooseFkQuerySet":
+        """
+        Load the values of the loose-fk fields in bulk when the queryset is
+        evaluated.
+
+        Pass ``None`` to clear the list of fields to prefetch.
+        """
+        clone = self._chain()
+        if field_names == (None,):
+            clone._prefetch_loose_fk_lookups = ()
+        else:
+            clone._prefetch_loose_fk_lookups += field_names
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._prefetch_loose_fk_lookups = self._prefetch_loose_fk_lookups
+        return clone
+
+    def _fetch_all(self):
+        super()._fetch_all()
+        if (
+            self._prefetch_loose_fk_lookups
+            and not self._prefetch_loose_fk_done
+            and issubclass(self._iterable_class, ModelIterable)
+        ):
+            prefetch_loose_fk(self._result_cache, *self._prefetch_loose_fk_lookups)
+            self._prefetch_loose_fk_done = True
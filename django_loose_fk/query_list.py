@@ -1,25 +1,145 @@
-from typing import Any
+import operator
+from typing import Any, Callable, Dict, List, Optional, Set
 
-from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.core.exceptions import FieldError, ValidationError
 from django.core.validators import URLValidator
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.functional import cached_property
+
+url_validator = URLValidator(schemes=["http", "https"])
 
 
 def is_url(value: Any) -> bool:
     if not isinstance(value, str):
         return False
 
-    validator = URLValidator(schemes=["http", "https"])
     try:
-        validator(value)
+        url_validator(value)
     except ValidationError:
         return False
 
     return True
 
 
+def _compare(op: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def lookup(value, rhs) -> bool:
+        # like SQL, NULL is not comparable
+        if value is None or rhs is None:
+            return False
+        return op(value, rhs)
+
+    return lookup
+
+
+def _contains(value, rhs) -> bool:
+    return value is not None and str(rhs) in str(value)
+
+
+def _icontains(value, rhs) -> bool:
+    return value is not None and str(rhs).lower() in str(value).lower()
+
+
+def _iexact(value, rhs) -> bool:
+    if value is None or rhs is None:
+        return value is rhs
+    return str(value).lower() == str(rhs).lower()
+
+
+def _startswith(value, rhs) -> bool:
+    return value is not None and str(value).startswith(str(rhs))
+
+
+def _istartswith(value, rhs) -> bool:
+    return value is not None and str(value).lower().startswith(str(rhs).lower())
+
+
+LOOKUPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "exact": operator.eq,
+    "iexact": _iexact,
+    "in": lambda value, rhs: value in rhs,
+    "contains": _contains,
+    "icontains": _icontains,
+    "startswith": _startswith,
+    "istartswith": _istartswith,
+    "gt": _compare(operator.gt),
+    "gte": _compare(operator.ge),
+    "lt": _compare(operator.lt),
+    "lte": _compare(operator.le),
+    "isnull": lambda value, rhs: (value is None) == bool(rhs),
+}
+
+
+def get_item_url(item) -> Optional[str]:
+    loose_fk_data = getattr(item, "_loose_fk_data", None)
+    if loose_fk_data is None:
+        return None
+    return loose_fk_data.get("url")
+
+
+def resolve_path(item, path: str):
+    """
+    Follow the attributes in ``path``, separated by ``__``.
+    """
+    value = item
+    for attr in path.split(LOOKUP_SEP):
+        if value is None:
+            return None
+        try:
+            value = getattr(value, attr)
+        except AttributeError as exc:
+            raise FieldError(f"Cannot resolve keyword '{attr}' for {item!r}") from exc
+    return value
+
+
+def matches_lookup(item, key: str, rhs) -> bool:
+    path, _, lookup_name = key.rpartition(LOOKUP_SEP)
+    if lookup_name not in LOOKUPS:
+        path, lookup_name = key, "exact"
+    return LOOKUPS[lookup_name](resolve_path(item, path), rhs)
+
+
+def get_sort_key(path: str) -> Callable[[Any], tuple]:
+    def sort_key(item) -> tuple:
+        value = resolve_path(item, path)
+        # None is never compared with other values thanks to the first element
+        return (value is None, value)
+
+    return sort_key
+
+
+def _matches(item, q: Q) -> Optional[bool]:
+    results = (
+        _matches(item, child) if isinstance(child, Q) else matches_lookup(item, *child)
+        for child in q.children
+    )
+    results = [result for result in results if result is not None]
+    if not results:
+        # nothing to match against, like an empty Q in Django
+        return None
+    matched = all(results) if q.connector == Q.AND else any(results)
+    return matched != q.negated
+
+
+def matches(item, q: Q) -> bool:
+    matched = _matches(item, q)
+    # like in Django, filter() and exclude() without conditions keep all items
+    return matched is None or matched
+
+
 class QueryList:
-    def __init__(self, items: list):
+    """
+    Queryset-like, in-memory collection of (remote) model instances.
+
+    Filtering supports the lookups in ``LOOKUPS`` and ``Q`` objects, evaluated in
+    Python. Membership tests by URL use an index on the URLs of the items.
+    """
+
+    def __init__(self, items: list, urls: Optional[List[str]] = None):
         self.items = items
+        # URLs of the items, in the same order, if they're known upfront
+        self.urls = urls
 
     def __repr__(self):
         return f"<QueryList items={repr(self.items)}>"
@@ -27,13 +147,31 @@ class QueryList:
     def __iter__(self):
         return iter(self.items)
 
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            urls = self.urls[key] if self.urls is not None else None
+            return self.__class__(self.items[key], urls=urls)
+        return self.items[key]
+
+    @cached_property
+    def _url_index(self) -> Dict[str, Any]:
+        urls = self.urls
+        if urls is None:
+            urls = [get_item_url(item) for item in self.items]
+        return {url: item for url, item in zip(urls, self.items) if url}
+
     def __contains__(self, item):
         # treat URls specially (for now at least)
         if not is_url(item):
             return item in self.items
 
-        urls = (_item._loose_fk_data.get("url") for _item in self.items)
-        return item in urls
+        return item in self._url_index
 
     def get(self):
         assert len(self.items) == 1
@@ -48,8 +186,122 @@ class QueryList:
     def count(self):
         return len(self.items)
 
+    def _filter(self, q: Q) -> "QueryList":
+        indices = [index for index, item in enumerate(self.items) if matches(item, q)]
+        urls = None
+        if self.urls is not None:
+            urls = [self.urls[index] for index in indices]
+        return QueryList([self.items[index] for index in indices], urls=urls)
+
     def filter(self, *expressions, **filters) -> "QueryList":
-        raise NotImplementedError
+        return self._filter(Q(*expressions, **filters))
 
     def exclude(self, *expressions, **filters) -> "QueryList":
-        raise NotImplementedError
+        return self._filter(~Q(*expressions, **filters))
+
+    def order_by(self, *fields: str) -> "QueryList":
+        """
+        Sort the items by the field paths, a leading ``-`` sorts descending.
+
+        Like PostgreSQL does, empty values are sorted as larger than other values.
+        """
+        pairs = list(zip(self.items, self.urls or [None] * len(self.items)))
+        # sort by the least significant field first, sorting is stable
+        for field in reversed(fields):
+            sort_key = get_sort_key(field.lstrip("-"))
+            pairs.sort(key=lambda pair: sort_key(pair[0]), reverse=field[0] == "-")
+
+        urls = [url for _, url in pairs] if self.urls is not None else None
+        return QueryList([item for item, _ in pairs], urls=urls)
+
+    def values_list(self, *fields: str, flat: bool = False) -> list:
+        if flat and len(fields) != 1:
+            raise TypeError(
+                "'flat' is not valid when values_list is called with more than one "
+                "field."
+            )
+        if flat:
+            return [resolve_path(item, fields[0]) for item in self.items]
+        return [
+            tuple(resolve_path(item, field) for field in fields) for item in self.items
+        ]
+
+
+class LazyQueryList(QueryList):
+    """
+    QueryList of which the items are loaded from their URLs when they're needed.
+
+    The number of items and membership tests by URL don't need the items. Iteration
+    and indexing load the items in batches of ``batch_size`` URLs with
+    ``load_many``, which may fetch them concurrently. Filtering and ordering load
+    all the items.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        load_many: Callable[[List[str]], list],
+        batch_size: Optional[int] = None,
+    ):
+        self.urls = urls
+        self.load_many = load_many
+        if batch_size is None:
+            batch_size = getattr(settings, "LOOSE_FK_FETCH_CONCURRENCY", 8)
+        self.batch_size = max(batch_size, 1)
+        # the items of the first len(self._loaded) URLs
+        self._loaded = []
+
+    def __repr__(self):
+        return f"<LazyQueryList urls={repr(self.urls)}>"
+
+    def _load_until(self, end: int) -> None:
+        end = min(end, len(self.urls))
+        while len(self._loaded) < end:
+            start = len(self._loaded)
+            batch_end = max(end, start + self.batch_size)
+            self._loaded += self.load_many(self.urls[start:batch_end])
+
+    @property
+    def items(self) -> list:
+        self._load_until(len(self.urls))
+        return self._loaded
+
+    def __iter__(self):
+        for index in range(len(self.urls)):
+            self._load_until(index + 1)
+            yield self._loaded[index]
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __bool__(self):
+        return bool(self.urls)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.__class__(
+                self.urls[key], load_many=self.load_many, batch_size=self.batch_size
+            )
+        index = range(len(self.urls))[key]
+        self._load_until(index + 1)
+        return self._loaded[index]
+
+    @cached_property
+    def _urls(self) -> Set[str]:
+        return set(self.urls)
+
+    def __contains__(self, item):
+        if not is_url(item):
+            return item in self.items
+
+        return item in self._urls
+
+    def get(self):
+        assert len(self.urls) == 1
+        return self[0]
+
+    def first(self):
+        return self[0] if self.urls else None
+
+    def count(self):
+        return len(self.urls)
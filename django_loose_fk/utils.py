@@ -1,11 +1,21 @@
-from urllib.parse import urlparse
+import hashlib
+import re
+import warnings
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple, Type
+from urllib.parse import urlparse, urlsplit, urlunsplit
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
 from django.db import models
+from django.db.models.constants import LOOKUP_SEP
 from django.http import HttpRequest
-from django.urls import Resolver404, get_resolver, get_script_prefix
+from django.urls import Resolver404, ResolverMatch, get_resolver, get_script_prefix
 
 from rest_framework import viewsets
+from rest_framework.generics import GenericAPIView
 from rest_framework.request import Request
 
 
@@ -14,58 +24,298 @@ def is_local(host: str, url: str) -> bool:
     Define if the url is local or external based on LOOSE_FK_LOCAL_BASE_URLS
     setting or a host
     """
-    parsed = urlparse(url)
-    local_base_urls = getattr(settings, "LOOSE_FK_LOCAL_BASE_URLS", [])
-    # if local base urls are defined - use them
-    if local_base_urls:
-        return any(url.startswith(base_url) for base_url in local_base_urls)
-
-        # otherwise use hostname
-    return parsed.netloc == host
+    return local_url_classifier.is_local_for_host(host, url)
 
 
-def get_viewset_for_path(path: str) -> viewsets.ViewSet:
+@dataclass(frozen=True, eq=False)
+class ViewSetMetadata:
     """
-    Look up which viewset matches a path.
+    The information about a viewset route needed to look up its objects.
     """
+
+    viewset_class: Type[viewsets.GenericViewSet]
+    initkwargs: Dict[str, Any]
+    actions: Dict[str, str]
+    lookup_field: str
+    lookup_url_kwarg: str
+
+    @classmethod
+    def from_callback(cls, callback) -> "ViewSetMetadata":
+        # TODO: add support for APIView
+        assert hasattr(callback, "cls"), "Callback doesn't appear to be from a viewset"
+
+        viewset_class, initkwargs = callback.cls, callback.initkwargs
+        lookup_field = initkwargs.get("lookup_field", viewset_class.lookup_field)
+        lookup_url_kwarg = (
+            initkwargs.get("lookup_url_kwarg", viewset_class.lookup_url_kwarg)
+            or lookup_field
+        )
+        return cls(
+            viewset_class=viewset_class,
+            initkwargs=initkwargs,
+            actions=callback.actions,
+            lookup_field=lookup_field,
+            lookup_url_kwarg=lookup_url_kwarg,
+        )
+
+    @property
+    def base_queryset(self) -> Optional[models.QuerySet]:
+        """
+        The queryset of the viewset if it can be used without instantiating the
+        viewset, i.e. when ``get_queryset`` is not overridden.
+        """
+        if self.viewset_class.get_queryset is not GenericAPIView.get_queryset:
+            return None
+        queryset = self.initkwargs.get("queryset", self.viewset_class.queryset)
+        return queryset if isinstance(queryset, models.QuerySet) else None
+
+    def get_viewset(self, args: tuple, kwargs: dict) -> viewsets.ViewSet:
+        viewset = self.viewset_class(**self.initkwargs)
+        viewset.action_map = self.actions
+        viewset.request = Request(HttpRequest())
+        viewset.args = args
+        viewset.kwargs = kwargs
+        return viewset
+
+    def get_queryset(self, args: tuple, kwargs: dict) -> models.QuerySet:
+        base_queryset = self.base_queryset
+        if base_queryset is not None:
+            return base_queryset.all()
+        return self.get_viewset(args, kwargs).get_queryset()
+
+
+_viewset_metadata: Dict[Any, ViewSetMetadata] = {}
+
+
+@lru_cache(maxsize=1024)
+def _resolve(path: str) -> ResolverMatch:
     # NOTE: this doesn't support setting a different urlconf on the request
-    resolver = get_resolver()
+    return get_resolver().resolve(path)
+
+
+def resolve_viewset(path: str) -> Tuple[ResolverMatch, ViewSetMetadata]:
+    """
+    Resolve a path to the URL kwargs and the (cached) metadata of its viewset.
+    """
     try:
-        resolver_match = resolver.resolve(path)
+        resolver_match = _resolve(path)
     except Resolver404 as exc:
         raise models.ObjectDoesNotExist("URL did not resolve") from exc
-    callback, callback_args, callback_kwargs = resolver_match
 
-    # TODO: add support for APIView
-    assert hasattr(callback, "cls"), "Callback doesn't appear to be from a viewset"
+    callback = resolver_match.func
+    metadata = _viewset_metadata.get(callback)
+    if metadata is None:
+        metadata = _viewset_metadata[callback] = ViewSetMetadata.from_callback(callback)
+    return resolver_match, metadata
 
-    viewset = callback.cls(**callback.initkwargs)
-    viewset.action_map = callback.actions
-    viewset.request = Request(HttpRequest())
-    viewset.args = callback_args
-    viewset.kwargs = callback_kwargs
 
-    return viewset
+def clear_viewset_cache(**kwargs) -> None:
+    """
+    Clear the cached URL resolutions and viewset metadata, e.g. after changing the
+    URLConf.
+    """
+    _resolve.cache_clear()
+    _viewset_metadata.clear()
 
 
-def get_resource_for_path(path: str) -> models.Model:
+def _on_setting_changed(setting, **kwargs):
+    if setting in ("ROOT_URLCONF", "FORCE_SCRIPT_NAME"):
+        clear_viewset_cache()
+
+
+setting_changed.connect(_on_setting_changed)
+
+
+def get_viewset_for_path(path: str) -> viewsets.ViewSet:
     """
-    Retrieve the API instance belonging to a (detail) path.
+    Look up which viewset matches a path.
     """
+    resolver_match, metadata = resolve_viewset(path)
+    return metadata.get_viewset(resolver_match.args, resolver_match.kwargs)
+
+
+def _strip_script_prefix(path: str) -> str:
     if settings.FORCE_SCRIPT_NAME and path.startswith(settings.FORCE_SCRIPT_NAME):
         path = path[len(settings.FORCE_SCRIPT_NAME) :]
 
-    path = path.replace(get_script_prefix(), "/", 1)
+    return path.replace(get_script_prefix(), "/", 1)
 
-    viewset = get_viewset_for_path(path)
 
-    queryset = viewset.get_queryset()
-    lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
-    filter_kwargs = {viewset.lookup_field: viewset.kwargs[lookup_url_kwarg]}
+def get_resource_for_path(path: str) -> models.Model:
+    """
+    Retrieve the API instance belonging to a (detail) path.
+    """
+    path = _strip_script_prefix(path)
+
+    resolver_match, metadata = resolve_viewset(path)
+
+    queryset = metadata.get_queryset(resolver_match.args, resolver_match.kwargs)
+    lookup_value = resolver_match.kwargs[metadata.lookup_url_kwarg]
+    filter_kwargs = {metadata.lookup_field: lookup_value}
 
     return queryset.get(**filter_kwargs)
 
 
+def get_resources_for_paths(
+    paths: Iterable[str], missing_ok: bool = False
+) -> List[Optional[models.Model]]:
+    """
+    Retrieve the API instances belonging to multiple (detail) paths.
+
+    The paths are grouped by viewset and lookup field, every group is retrieved
+    with a single query. The instances are returned in the order of ``paths``.
+
+    If a path doesn't resolve to an instance, ``ObjectDoesNotExist`` is raised, or
+    ``None`` is returned in its place if ``missing_ok`` is set.
+    """
+    paths = list(paths)
+    groups, errors = _group_paths(paths)
+
+    results = [None] * len(paths)
+    for (metadata, _), (resolver_match, values) in groups.items():
+        queryset = metadata.get_queryset(resolver_match.args, resolver_match.kwargs)
+        found = _get_by_lookup(queryset, metadata.lookup_field, list(values))
+        for value, indices in values.items():
+            for index in indices:
+                if value in found:
+                    results[index] = found[value]
+                else:
+                    errors[index] = queryset.model.DoesNotExist(
+                        f"{queryset.model._meta.object_name} matching query "
+                        "does not exist."
+                    )
+
+    if errors and not missing_ok:
+        raise errors[min(errors)]
+    return results
+
+
+def _group_paths(paths: List[str]) -> Tuple[dict, dict]:
+    """
+    Group the paths by viewset and the URL kwargs other than the lookup value.
+
+    Returns the groups, mapping the lookup values to the indices of their paths,
+    and the resolve errors by index.
+    """
+    groups, errors = {}, {}
+    for index, path in enumerate(paths):
+        try:
+            resolver_match, metadata = resolve_viewset(_strip_script_prefix(path))
+        except models.ObjectDoesNotExist as exc:
+            errors[index] = exc
+            continue
+
+        # other URL kwargs (e.g. of nested routes) may affect the queryset
+        other_kwargs = tuple(
+            sorted(
+                (key, value)
+                for key, value in resolver_match.kwargs.items()
+                if key != metadata.lookup_url_kwarg
+            )
+        )
+        key = (metadata, other_kwargs)
+        _, values = groups.setdefault(key, (resolver_match, {}))
+        lookup_value = resolver_match.kwargs[metadata.lookup_url_kwarg]
+        values.setdefault(lookup_value, []).append(index)
+    return groups, errors
+
+
+def get_lookup_values_for_paths(
+    paths: Iterable[str], target_field: models.Field
+) -> Tuple[list, List[models.QuerySet]]:
+    """
+    Map (detail) paths to values of ``target_field`` without retrieving the instances.
+
+    If the viewset looks up its objects by ``target_field`` on an unfiltered
+    queryset, the values are taken from the paths directly. Otherwise, a queryset
+    of the ``target_field`` values is returned per viewset, to be used as subquery.
+    Paths that don't resolve to a viewset of the model of ``target_field`` are
+    skipped.
+    """
+    model = target_field.model
+    target_names = {target_field.name, target_field.attname}
+    if target_field.primary_key:
+        target_names.add("pk")
+
+    paths = [path for path in paths if _is_viewset_path(_strip_script_prefix(path))]
+    groups, _ = _group_paths(paths)
+
+    values, querysets = [], []
+    for (metadata, _), (resolver_match, lookup_values) in groups.items():
+        base_queryset = metadata.base_queryset
+        if base_queryset is not None and base_queryset.model is not model:
+            continue
+
+        if (
+            metadata.lookup_field in target_names
+            and base_queryset is not None
+            and not base_queryset.query.has_filters()
+        ):
+            for value in lookup_values:
+                try:
+                    values.append(target_field.to_python(value))
+                except ValidationError:
+                    continue
+            continue
+
+        queryset = metadata.get_queryset(resolver_match.args, resolver_match.kwargs)
+        if queryset.model is not model:
+            continue
+        filter_kwargs = {f"{metadata.lookup_field}__in": list(lookup_values)}
+        try:
+            queryset = queryset.filter(**filter_kwargs)
+        except (ValueError, ValidationError):
+            # lookup values of the wrong type can't match any object
+            continue
+        querysets.append(queryset.values(target_field.attname))
+    return values, querysets
+
+
+def _is_viewset_path(path: str) -> bool:
+    try:
+        resolver_match = _resolve(path)
+    except Resolver404:
+        return False
+    return hasattr(resolver_match.func, "cls")
+
+
+def _get_by_lookup(queryset, lookup_field: str, values: list) -> dict:
+    """
+    Retrieve the objects from the queryset with a single query, by lookup value.
+    """
+    opts = queryset.model._meta
+    if LOOKUP_SEP in lookup_field:
+        # no single field to map the results back with, fall back to a query per value
+        found = {}
+        for value in values:
+            try:
+                found[value] = queryset.get(**{lookup_field: value})
+            except queryset.model.DoesNotExist:
+                pass
+        return found
+
+    field = opts.pk if lookup_field == "pk" else opts.get_field(lookup_field)
+
+    python_values = {}
+    for value in values:
+        try:
+            python_values[field.to_python(value)] = value
+        except ValidationError:
+            continue
+
+    found = {}
+    for instance in queryset.filter(**{f"{lookup_field}__in": list(python_values)}):
+        value = python_values.get(getattr(instance, field.attname))
+        if value is None:
+            continue
+        if value in found:
+            raise queryset.model.MultipleObjectsReturned(
+                f"More than one object with {lookup_field}={value}"
+            )
+        found[value] = instance
+    return found
+
+
 def get_subclasses(cls):
     for subclass in cls.__subclasses__():
         yield from get_subclasses(subclass)
@@ -74,3 +324,126 @@ def get_subclasses(cls):
 
 def strip_port_number_and_lowercase(netloc: str) -> str:
     return netloc.split(":")[0].lower()
+
+
+def _compile_host_pattern(pattern: str) -> str:
+    """
+    Translate an ``ALLOWED_HOSTS`` entry into a regex, mirroring
+    :func:`django.http.request.validate_host`.
+    """
+    pattern = pattern.lower()
+    if pattern == "*":
+        return ".*"
+    if pattern.startswith("."):
+        return f"{re.escape(pattern[1:])}|.*{re.escape(pattern)}"
+    return re.escape(pattern)
+
+
+class LocalURLClassifier:
+    """
+    Classify URLs as local or remote.
+
+    The ``ALLOWED_HOSTS`` and ``LOOSE_FK_LOCAL_BASE_URLS`` settings are compiled
+    into regular expressions once, and recent verdicts are cached. Both are rebuilt
+    when one of these settings changes.
+    """
+
+    verdict_cache_size = 4096
+
+    def __init__(self):
+        self.reset()
+        setting_changed.connect(self._on_setting_changed)
+
+    def _on_setting_changed(self, setting, **kwargs):
+        if setting in ("ALLOWED_HOSTS", "LOOSE_FK_LOCAL_BASE_URLS"):
+            self.reset()
+
+    def reset(self) -> None:
+        self._matchers = None
+        self.is_local_url = lru_cache(maxsize=self.verdict_cache_size)(
+            self._is_local_url
+        )
+        self.is_local_for_host = lru_cache(maxsize=self.verdict_cache_size)(
+            self._is_local_for_host
+        )
+
+    def _get_matchers(self) -> Tuple[Optional[Pattern], Pattern, bool]:
+        if self._matchers is not None:
+            return self._matchers
+
+        local_base_urls = getattr(settings, "LOOSE_FK_LOCAL_BASE_URLS", [])
+        base_urls_re = (
+            re.compile("|".join(re.escape(base_url) for base_url in local_base_urls))
+            if local_base_urls
+            else None
+        )
+        allowed_hosts = settings.ALLOWED_HOSTS
+        hosts_re = re.compile(
+            "|".join(f"(?:{_compile_host_pattern(host)})" for host in allowed_hosts)
+            or "(?!)"
+        )
+        wildcard = any(pattern == "*" for pattern in allowed_hosts)
+        if wildcard:
+            warnings.warn(
+                "You have wildcards in your ALLOWED_HOSTS setting - "
+                "this will cause all remote URLs to be considered local URLs and "
+                "break django-loose-fk's behaviour. You should use an explicit list.",
+                RuntimeWarning,
+            )
+
+        self._matchers = (base_urls_re, hosts_re, wildcard)
+        return self._matchers
+
+    def _is_local_url(self, url: str) -> bool:
+        base_urls_re, hosts_re, wildcard = self._get_matchers()
+        if base_urls_re is not None and not wildcard:
+            return base_urls_re.match(url) is not None
+
+        host = strip_port_number_and_lowercase(urlparse(url).netloc)
+        return hosts_re.fullmatch(host) is not None
+
+    def _is_local_for_host(self, host: str, url: str) -> bool:
+        base_urls_re = self._get_matchers()[0]
+        # if local base urls are defined - use them
+        if base_urls_re is not None:
+            return base_urls_re.match(url) is not None
+
+        # otherwise use hostname
+        return urlparse(url).netloc == host
+
+
+local_url_classifier = LocalURLClassifier()
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so that equivalent URLs can be used as the same (cache) key.
+
+    The scheme and host are lowercased, default ports and fragments are dropped and
+    an empty path becomes ``/``. The path and query string are left untouched.
+    Malformed URLs are normalized as far as possible, they're not validated here.
+    """
+    try:
+        parsed = urlsplit(url)
+    except ValueError:  # e.g. invalid IPv6 addresses
+        return url
+
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    try:
+        port = parsed.port
+    except ValueError:  # invalid port, keep the netloc as is
+        port = None
+    if port is not None and DEFAULT_PORTS.get(scheme) == port:
+        netloc = netloc.rsplit(":", 1)[0]
+    return urlunsplit((scheme, netloc, parsed.path or "/", parsed.query, ""))
+
+
+def get_url_digest(url: str) -> bytes:
+    """
+    Return the sha256 digest of the normalized URL.
+    """
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).digest()
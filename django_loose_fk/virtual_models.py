@@ -1,37 +1,81 @@
-from functools import lru_cache
-from typing import Any, Dict, List, Union
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from django.apps import apps
+from django.conf import settings
 from django.db import models
+from django.db.models import DEFERRED, Field
 from django.db.models.base import ModelBase
 
-from .query_list import QueryList
+from .query_list import LazyQueryList, QueryList
 
 DictOrUrl = Union[Dict[str, Any], str]
 
 
-def get_model_instance(model: ModelBase, data: Dict[str, Any], loader) -> models.Model:
-    # loop over the model fields, extract the data and convert it to the appropriate
-    # python type
-    model_data = {}
+ConversionPlan = Tuple[Tuple[str, Optional[Callable[[Any], Any]]], ...]
+
+
+@lru_cache(maxsize=None)
+def get_conversion_plan(model: ModelBase) -> ConversionPlan:
+    """
+    Determine which fields to extract from remote data and how to convert them.
+
+    Fields that don't convert their input (the base ``Field.to_python``) get
+    ``None`` as converter and are copied as-is.
+    """
+    plan = []
     for field in model._meta.get_fields():
         if field.auto_created:
             continue
 
-        # nothing to do for this field if it's not present in the data offered
-        if field.name not in data:
-            continue
+        to_python = getattr(type(field), "to_python", Field.to_python)
+        plan.append(
+            (field.name, None if to_python is Field.to_python else field.to_python)
+        )
+    return tuple(plan)
+
+
+def get_model_instance(model: ModelBase, data: Dict[str, Any], loader) -> models.Model:
+    return get_model_instances(model, [data], loader=loader)[0]
+
+
+def get_model_instances(
+    model: ModelBase, payloads: Iterable[Dict[str, Any]], loader
+) -> List[models.Model]:
+    """
+    Build virtual model instances for a batch of remote data.
+
+    With the ``LOOSE_FK_LAZY_VIRTUAL_MODELS`` setting, field values are only
+    converted when they're accessed.
+    """
+    virtual_model = virtual_model_factory(model)
+    if getattr(settings, "LOOSE_FK_LAZY_VIRTUAL_MODELS", False):
+        return [virtual_model.from_lazy_data(data, loader=loader) for data in payloads]
+
+    plan = get_conversion_plan(model)
+    instances = []
+    for data in payloads:
+        # extract the data and convert it to the appropriate python type
+        model_data = {}
+        for name, to_python in plan:
+            # nothing to do for this field if it's not present in the data offered
+            if name not in data:
+                continue
 
-        # ensure the raw input is cast to the right data type
-        model_data[field.name] = field.to_python(data[field.name])
+            # ensure the raw input is cast to the right data type
+            value = data[name]
+            model_data[name] = to_python(value) if to_python is not None else value
 
-    virtual_model = virtual_model_factory(model, loader=loader)
-    return virtual_model(url=data.get("url"), initial_data=data, **model_data)
+        instances.append(
+            virtual_model(
+                url=data.get("url"), initial_data=data, loader=loader, **model_data
+            )
+        )
+    return instances
 
 
 class VirtualModelBase(ModelBase):
     def __new__(cls, name, bases, attrs, **kwargs):
-        loader = attrs.pop("_loose_fk_loader")
         new_cls = super().__new__(cls, name, bases, attrs, **kwargs)
 
         for field in new_cls._meta.get_fields():
@@ -42,21 +86,75 @@ class VirtualModelBase(ModelBase):
                 continue
 
             Handler = HANDLERS[type(field)]
-            handler = Handler(
-                field.name, loader=loader, remote_model=field.related_model
-            )
+            handler = Handler(field.name, remote_model=field.related_model)
             # install new descriptor
             setattr(new_cls, field.name, handler)
 
+        # relations and virtual fields (e.g. chained loose-fk fields) are always set
+        # from the raw data, also for lazy instances
+        new_cls._loose_fk_eager_fields = tuple(
+            field.name
+            for field in new_cls._meta.get_fields()
+            if not field.auto_created and (field.is_relation or not field.concrete)
+        )
+
         return new_cls
 
 
 class ProxyMixin:
-    def __init__(self, url: str, initial_data: dict, *args, **kwargs):
+    _loose_fk_lazy = False
+
+    def __init__(self, url: str, initial_data: dict, *args, loader=None, **kwargs):
         self._loose_fk_data = {"url": url}
         self._initial_data = initial_data
+        # the loader to resolve relations of the remote object with
+        self._loose_fk_loader = loader
         super().__init__(*args, **kwargs)
 
+    @classmethod
+    def from_lazy_data(cls, data: Dict[str, Any], loader=None) -> "ProxyMixin":
+        """
+        Build an instance that converts its field values on first access.
+
+        All concrete fields are deferred, except for the primary key which is
+        always empty for remote objects.
+        """
+        values = [
+            None if field.primary_key else DEFERRED
+            for field in cls._meta.concrete_fields
+        ]
+        instance = cls(data.get("url"), data, *values, loader=loader)
+        instance._loose_fk_lazy = True
+        for name in cls._loose_fk_eager_fields:
+            if name in data:
+                setattr(instance, name, data[name])
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        """
+        Convert the deferred fields of lazy instances from the raw data.
+        """
+        if not self._loose_fk_lazy:
+            return super().refresh_from_db(using=using, fields=fields, **kwargs)
+
+        deferred = self.get_deferred_fields() if fields is None else set(fields)
+        converters = dict(get_conversion_plan(type(self)))
+        for field in self._meta.concrete_fields:
+            if field.attname not in deferred:
+                continue
+
+            if field.is_relation:
+                # relations are handled by the handlers, based on the raw data
+                value = None
+            elif field.name in self._initial_data:
+                value = self._initial_data[field.name]
+                to_python = converters.get(field.name)
+                if to_python is not None:
+                    value = to_python(value)
+            else:
+                value = field.get_default()
+            self.__dict__[field.attname] = value
+
     def __eq__(self, other):
         if isinstance(other, str):  # compare URLs
             return self._loose_fk_data["url"] == other
@@ -71,7 +169,15 @@ class ProxyMixin:
 
 
 @lru_cache(maxsize=None)
-def virtual_model_factory(model: ModelBase, loader) -> VirtualModelBase:
+def virtual_model_factory(model: ModelBase) -> VirtualModelBase:
+    """
+    Return the proxy model used for remote instances of ``model``.
+
+    There is exactly one proxy model per model, the loader is bound to the
+    instances. Use ``virtual_model_factory.cache_info()`` to inspect the number of
+    proxy models created.
+    """
+
     class Meta:
         proxy = True
 
@@ -88,16 +194,15 @@ def virtual_model_factory(model: ModelBase, loader) -> VirtualModelBase:
     Proxy = VirtualModelBase(
         name,
         (ProxyMixin, model),
-        {"__module__": model.__module__, "_loose_fk_loader": loader, "Meta": Meta},
+        {"__module__": model.__module__, "Meta": Meta},
     )
 
     return Proxy
 
 
 class BaseHandler:
-    def __init__(self, field_name: str, loader, remote_model: ModelBase):
+    def __init__(self, field_name: str, remote_model: ModelBase):
         self.field_name = field_name
-        self.loader = loader
         self.remote_model = remote_model
 
     def __set__(self, instance: models.Model, value: List[DictOrUrl]):
@@ -105,24 +210,55 @@ class BaseHandler:
 
 
 class M2MHandler(BaseHandler):
-    def __get__(self, instance, cls=None) -> QueryList:
+    def _get_urls(self, instance) -> List[str]:
         raw_data = instance._loose_fk_data.get(self.field_name, [])
         assert all(isinstance(url, str) for url in raw_data)
+        return raw_data
 
-        loaded_data = [
-            self.loader.load(url=url, model=self.remote_model) for url in raw_data
-        ]
+    def __get__(self, instance, cls=None) -> QueryList:
+        if instance is None:
+            return self
+
+        urls = self._get_urls(instance)
+        if getattr(settings, "LOOSE_FK_LAZY_M2M", False):
+            load_many = partial(
+                instance._loose_fk_loader.load_many, model=self.remote_model
+            )
+            return LazyQueryList(urls, load_many=load_many)
 
-        return QueryList(loaded_data)
+        # fetched concurrently, see LOOSE_FK_FETCH_CONCURRENCY
+        loaded_data = instance._loose_fk_loader.load_many(urls, model=self.remote_model)
+
+        return QueryList(loaded_data, urls=urls)
+
+    async def aget(self, instance) -> QueryList:
+        urls = self._get_urls(instance)
+        loaded_data = await instance._loose_fk_loader.aload_many(
+            urls, model=self.remote_model
+        )
+        return QueryList(loaded_data, urls=urls)
 
 
 class FKHandler(BaseHandler):
-    def __get__(self, instance, cls=None) -> models.Model:
+    def _get_url(self, instance) -> Optional[str]:
         raw_data = instance._loose_fk_data.get(self.field_name, None)
-        if raw_data is None:
+        assert raw_data is None or isinstance(raw_data, str)
+        return raw_data
+
+    def __get__(self, instance, cls=None) -> models.Model:
+        if instance is None:
+            return self
+
+        url = self._get_url(instance)
+        if url is None:
+            return None
+        return instance._loose_fk_loader.load(url=url, model=self.remote_model)
+
+    async def aget(self, instance) -> models.Model:
+        url = self._get_url(instance)
+        if url is None:
             return None
-        assert isinstance(raw_data, str)
-        return self.loader.load(url=raw_data, model=self.remote_model)
+        return await instance._loose_fk_loader.aload(url=url, model=self.remote_model)
 
 
 HANDLERS = {models.ForeignKey: FKHandler, models.ManyToManyField: M2MHandler}
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:28
+
+from django.db import migrations, models
+
+import django_loose_fk.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("testapp", "0004_zaakobjectfk"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="zaakobject2",
+            name="extern_zaak_hash",
+            field=models.BigIntegerField(
+                blank=True, db_index=True, editable=False, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="zaakobject2",
+            name="zaak",
+            field=django_loose_fk.fields.FkOrURLField(
+                blank=False,
+                fk_field="_zaak",
+                null=False,
+                url_field="extern_zaak",
+                url_hash_field="extern_zaak_hash",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:28
+
+from django.db import migrations
+
+import django_loose_fk.fields
+import django_loose_fk.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("testapp", "0005_zaakobject2_extern_zaak_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="zaakobject",
+            name="zaak",
+            field=django_loose_fk.fields.FkOrURLField(
+                blank=False,
+                fk_field="_zaak",
+                index_url=True,
+                null=False,
+                url_field="extern_zaak",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="zaakobject",
+            index=django_loose_fk.indexes.FkOrURLFieldIndex(
+                name="testapp_zaa_extern__a6d397_idx", url_field="extern_zaak"
+            ),
+        ),
+    ]
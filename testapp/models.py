@@ -3,6 +3,7 @@ import uuid
 from django.db import models
 
 from django_loose_fk.fields import FkOrURLField
+from django_loose_fk.prefetch import LooseFkQuerySet
 
 
 class ZaakType(models.Model):
@@ -24,6 +25,8 @@ class Zaak(models.Model):
     extern_zaaktype = models.URLField(blank=True)
     zaaktype = FkOrURLField(fk_field="_zaaktype", url_field="extern_zaaktype")
 
+    objects = LooseFkQuerySet.as_manager()
+
     class Meta:
         verbose_name = "zaak"
         verbose_name_plural = "zaken"
@@ -36,13 +39,18 @@ class ZaakObject(models.Model):
     name = models.CharField("name", max_length=50)
     _zaak = models.ForeignKey("Zaak", null=True, blank=True, on_delete=models.PROTECT)
     extern_zaak = models.URLField(blank=True)
-    zaak = FkOrURLField(fk_field="_zaak", url_field="extern_zaak")
+    zaak = FkOrURLField(fk_field="_zaak", url_field="extern_zaak", index_url=True)
 
 
 class ZaakObject2(models.Model):
     _zaak = models.ForeignKey("Zaak", null=True, blank=True, on_delete=models.PROTECT)
     extern_zaak = models.URLField(blank=True)
-    zaak = FkOrURLField(fk_field="_zaak", url_field="extern_zaak")
+    extern_zaak_hash = models.BigIntegerField(
+        null=True, blank=True, editable=False, db_index=True
+    )
+    zaak = FkOrURLField(
+        fk_field="_zaak", url_field="extern_zaak", url_hash_field="extern_zaak_hash"
+    )
 
 
 class ZaakObjectFk(models.Model):
@@ -9,7 +9,10 @@ from django.test import override_settings
 import pytest
 import requests_mock
 from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
 
+from django_loose_fk.cache import verdict_cache
+from testapp.api import ZaakSerializer
 from testapp.models import Zaak, ZaakType
 
 pytestmark = pytest.mark.django_db()
@@ -234,3 +237,157 @@ def test_write_remote_url_with_local_base_urls(mock, api_client):
         assert response.status_code == 201
         zaak = Zaak.objects.get()
         assert zaak.zaaktype == zaaktype_url
+
+
+def test_write_remote_url_fetched_once(api_client):
+    url = reverse("zaak-list")
+    zaaktype_url = "https://example.com/zaaktypen/123"
+
+    with requests_mock.Mocker() as m:
+        m.get(zaaktype_url, json={"url": zaaktype_url, "name": "test"})
+
+        response = api_client.post(url, {"name": "test", "zaaktype": zaaktype_url})
+
+    assert response.status_code == 201
+    assert m.call_count == 1
+
+
+def test_write_local_url_resolved_once(api_client, django_assert_num_queries):
+    url = reverse("zaak-list")
+    zaaktype = ZaakType.objects.create(name="test")
+    zaaktype_url = reverse("zaaktype-detail", kwargs={"pk": zaaktype.pk})
+    data = {"name": "test", "zaaktype": f"http://testserver{zaaktype_url}"}
+
+    # one query to resolve the zaaktype and one to insert the zaak
+    with django_assert_num_queries(2):
+        response = api_client.post(url, data)
+
+    assert response.status_code == 201
+
+
+def test_write_remote_url_head_validation(api_client, settings):
+    settings.LOOSE_FK_VALIDATION_METHOD = "HEAD"
+    url = reverse("zaak-list")
+    zaaktype_url = "https://example.com/zaaktypen/123"
+
+    with requests_mock.Mocker() as m:
+        m.head(zaaktype_url)
+
+        response = api_client.post(url, {"name": "test", "zaaktype": zaaktype_url})
+
+    assert response.status_code == 201
+    assert [request.method for request in m.request_history] == ["HEAD"]
+    assert Zaak.objects.get().extern_zaaktype == zaaktype_url
+
+
+def test_write_remote_url_head_validation_not_found(api_client, settings):
+    settings.LOOSE_FK_VALIDATION_METHOD = "HEAD"
+    url = reverse("zaak-list")
+    zaaktype_url = "https://example.com/zaaktypen/123"
+
+    with requests_mock.Mocker() as m:
+        m.head(zaaktype_url, status_code=404)
+
+        response = api_client.post(url, {"name": "test", "zaaktype": zaaktype_url})
+
+    assert response.status_code == 400
+    assert response.data["zaaktype"][0].code == "bad-url"
+
+
+def test_write_remote_url_trusted_host(api_client, settings):
+    settings.LOOSE_FK_VALIDATION_TRUSTED_HOSTS = ["example.com"]
+    url = reverse("zaak-list")
+    zaaktype_url = "https://example.com/zaaktypen/123"
+
+    with requests_mock.Mocker() as m:
+        response = api_client.post(url, {"name": "test", "zaaktype": zaaktype_url})
+
+    assert response.status_code == 201
+    assert m.call_count == 0
+    assert Zaak.objects.get().extern_zaaktype == zaaktype_url
+
+
+def test_write_remote_url_cached_verdict(api_client, settings):
+    settings.LOOSE_FK_VALIDATION_METHOD = "HEAD"
+    settings.LOOSE_FK_VALIDATION_CACHE_TIMEOUT = 60
+    url = reverse("zaak-list")
+    zaaktype_url = "https://example.com/zaaktypen/cached-verdict"
+
+    try:
+        with requests_mock.Mocker() as m:
+            m.head(zaaktype_url)
+
+            response1 = api_client.post(url, {"name": "test", "zaaktype": zaaktype_url})
+            response2 = api_client.post(url, {"name": "test", "zaaktype": zaaktype_url})
+    finally:
+        verdict_cache.clear()
+
+    assert response1.status_code == 201
+    assert response2.status_code == 201
+    assert m.call_count == 1
+    assert Zaak.objects.filter(zaaktype=zaaktype_url).count() == 2
+
+
+def test_validated_remote_value_is_always_an_instance(settings):
+    settings.LOOSE_FK_VALIDATION_CACHE_TIMEOUT = 60
+    zaaktype_url = "https://example.com/zaaktypen/verdict-get"
+    request = APIRequestFactory().post("/")
+
+    try:
+        with requests_mock.Mocker() as m:
+            m.get(zaaktype_url, json={"url": zaaktype_url, "name": "test"})
+
+            validated = []
+            for _ in range(2):
+                serializer = ZaakSerializer(
+                    data={"name": "test", "zaaktype": zaaktype_url},
+                    context={"request": request},
+                )
+                assert serializer.is_valid(), serializer.errors
+                validated.append(serializer.validated_data["zaaktype"])
+    finally:
+        verdict_cache.clear()
+
+    assert m.call_count == 2
+    assert [obj.name for obj in validated] == ["test", "test"]
+
+
+def test_read_local_fks_with_url_templates(api_client, settings):
+    zaaktypen = [ZaakType.objects.create(name=str(i)) for i in range(12)]
+    for zaaktype in zaaktypen:
+        Zaak.objects.create(name="test", zaaktype=zaaktype)
+    Zaak.objects.create(name="test", zaaktype="https://example.com/zaaktypen/123")
+    url = reverse("zaak-list")
+    expected = api_client.get(url).data
+
+    settings.LOOSE_FK_URL_TEMPLATES = True
+    with patch("rest_framework.relations.reverse", wraps=reverse) as mock_reverse:
+        response = api_client.get(url)
+
+    assert response.status_code == 200
+    assert response.data == expected
+    assert [item["zaaktype"] for item in response.data][:12] == [
+        "http://testserver" + reverse("zaaktype-detail", kwargs={"pk": zaaktype.pk})
+        for zaaktype in zaaktypen
+    ]
+    # the zaaktype URL is reversed once, to make the template
+    view_names = [call.args[0] for call in mock_reverse.call_args_list]
+    assert view_names.count("zaaktype-detail") == 1
+
+
+def test_read_local_fks_with_url_templates_from_fk_value(
+    api_client, settings, django_assert_num_queries
+):
+    zaaktypen = [ZaakType.objects.create(name=str(i)) for i in range(3)]
+    for zaaktype in zaaktypen:
+        Zaak.objects.create(name="test", zaaktype=zaaktype)
+    url = reverse("zaak-list")
+    expected = api_client.get(url).data
+
+    settings.LOOSE_FK_URL_TEMPLATES = True
+    # the zaaktypen are not loaded
+    with django_assert_num_queries(1):
+        response = api_client.get(url)
+
+    assert response.status_code == 200
+    assert response.data == expected
@@ -0,0 +1,244 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import requests_mock
+from asgiref.sync import async_to_sync
+from rest_framework.reverse import reverse
+
+from django_loose_fk.fields import aget_related
+from django_loose_fk.identity_map import identity_map
+from django_loose_fk.loaders import (
+    FetchError,
+    FetchJsonError,
+    HttpxLoader,
+    RequestsLoader,
+)
+from django_loose_fk.virtual_models import FKHandler, M2MHandler
+from testapp.models import TypeA, Zaak, ZaakType
+
+
+class Handler:
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.calls.append(url)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return self.respond(url)
+
+    @staticmethod
+    def respond(url: str) -> httpx.Response:
+        if url.endswith("404"):
+            return httpx.Response(404)
+        if url.endswith("text"):
+            return httpx.Response(200, text="some text")
+        return httpx.Response(200, json={"url": url, "name": url.rsplit("/", 1)[1]})
+
+
+class SyncHandler(Handler):
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(str(request.url))
+        return self.respond(str(request.url))
+
+
+def test_httpx_loader_aload():
+    handler = Handler()
+    loader = HttpxLoader(transport=httpx.MockTransport(handler))
+
+    zaaktype = async_to_sync(loader.aload)("https://example.com/zt/1", ZaakType)
+
+    assert isinstance(zaaktype, ZaakType)
+    assert zaaktype.name == "1"
+    assert handler.calls == ["https://example.com/zt/1"]
+
+
+def test_httpx_loader_sync_load():
+    handler = SyncHandler()
+    loader = HttpxLoader(transport=httpx.MockTransport(handler))
+
+    zaaktype = loader.load("https://example.com/zt/1", ZaakType)
+
+    assert zaaktype.name == "1"
+
+
+@pytest.mark.parametrize(
+    "url,exc",
+    [
+        ("https://example.com/404", FetchError),
+        ("https://example.com/text", FetchJsonError),
+    ],
+)
+def test_httpx_loader_errors(url, exc):
+    loader = HttpxLoader(transport=httpx.MockTransport(Handler()))
+
+    with pytest.raises(exc):
+        async_to_sync(loader.aload)(url, ZaakType)
+
+
+def test_httpx_loader_transport_error():
+    def handler(request):
+        raise httpx.ConnectError("no route", request=request)
+
+    loader = HttpxLoader(transport=httpx.MockTransport(handler))
+
+    with pytest.raises(FetchError):
+        loader.fetch_object("https://example.com/1")
+
+
+def test_httpx_loader_check_object_overridden_fetch_object():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return Handler.respond(str(request.url))
+
+    class AuthLoader(HttpxLoader):
+        def fetch_object(self, url: str) -> dict:
+            response = self.client.get(url, headers={"Authorization": "Token secret"})
+            return self._get_data(response)
+
+    loader = AuthLoader(transport=httpx.MockTransport(handler))
+
+    loader.check_object("https://example.com/zt/1")
+    with pytest.raises(FetchError):
+        loader.check_object("https://example.com/zt/404")
+
+    assert [request.method for request in requests] == ["GET", "GET"]
+    assert requests[0].headers["Authorization"] == "Token secret"
+
+
+def test_aload_many_concurrent(settings):
+    settings.LOOSE_FK_FETCH_CONCURRENCY = 3
+    handler = Handler()
+    loader = HttpxLoader(transport=httpx.MockTransport(handler))
+    urls = [f"https://example.com/zt/{i}" for i in range(6)]
+
+    loaded = async_to_sync(loader.aload_many)(urls + urls[:1], ZaakType)
+
+    assert [obj.name for obj in loaded] == ["0", "1", "2", "3", "4", "5", "0"]
+    assert len(handler.calls) == 6
+    assert 1 < handler.max_active <= 3
+
+
+class ClientTrackingLoader(HttpxLoader):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.async_clients = []
+
+    def _create_async_client(self):
+        client = super()._create_async_client()
+        self.async_clients.append(client)
+        return client
+
+
+def test_httpx_loader_closes_async_clients():
+    loader = ClientTrackingLoader(transport=httpx.MockTransport(Handler()))
+
+    async_to_sync(loader.aload)("https://example.com/zt/1", ZaakType)
+    async_to_sync(loader.aload)("https://example.com/zt/2", ZaakType)
+
+    assert len(loader.async_clients) == 2
+    assert all(client.is_closed for client in loader.async_clients)
+
+
+def test_aload_many_shares_async_client():
+    loader = ClientTrackingLoader(transport=httpx.MockTransport(Handler()))
+    urls = [f"https://example.com/zt/{i}" for i in range(4)]
+
+    loaded = async_to_sync(loader.aload_many)(urls, ZaakType)
+
+    assert [obj.name for obj in loaded] == ["0", "1", "2", "3"]
+    assert len(loader.async_clients) == 1
+    assert loader.async_clients[0].is_closed
+
+
+def test_aload_uses_identity_map():
+    handler = Handler()
+    loader = HttpxLoader(transport=httpx.MockTransport(handler))
+
+    async def load_twice():
+        with identity_map():
+            return await asyncio.gather(
+                loader.aload("https://example.com/zt/1", ZaakType),
+                loader.aload("https://example.com/zt/1", ZaakType),
+            )
+
+    first, second = async_to_sync(load_twice)()
+
+    assert first is second
+
+
+def test_virtual_model_handlers_aget():
+    loader = HttpxLoader(transport=httpx.MockTransport(Handler()))
+    instance = SimpleNamespace(
+        _loose_fk_loader=loader,
+        _loose_fk_data={
+            "a_type": "https://example.com/a/1",
+            "a_types": ["https://example.com/a/2", "https://example.com/a/3"],
+        },
+    )
+
+    fk = async_to_sync(FKHandler("a_type", TypeA).aget)(instance)
+    m2m = async_to_sync(M2MHandler("a_types", TypeA).aget)(instance)
+
+    assert fk.name == "1"
+    assert [obj.name for obj in m2m] == ["2", "3"]
+
+
+@pytest.mark.django_db
+def test_aget_related_local_and_remote():
+    zaaktype = ZaakType.objects.create(name="local")
+    local = Zaak.objects.create(zaaktype=zaaktype)
+    local = Zaak.objects.get(pk=local.pk)
+    remote = Zaak.objects.create(zaaktype="https://example.com/zt/1")
+
+    async def resolve():
+        return await asyncio.gather(
+            aget_related(local, "zaaktype"),
+            aget_related(remote, "zaaktype"),
+            aget_related(remote, "name"),
+        )
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "https://example.com/zt/1",
+            json={"url": "https://example.com/zt/1", "name": "remote"},
+        )
+
+        local_zaaktype, remote_zaaktype, name = async_to_sync(resolve)()
+
+    assert local_zaaktype == zaaktype
+    assert remote_zaaktype.name == "remote"
+    assert name == ""
+    # the loaded object is cached on the instance
+    assert remote.zaaktype is remote_zaaktype
+
+
+@pytest.mark.django_db
+def test_aload_chained_local_url():
+    zaaktype = ZaakType.objects.create(name="local")
+    zaaktype_url = reverse("zaaktype-detail", kwargs={"pk": zaaktype.pk})
+    zaak_url = "https://example.com/zaken/1"
+    loader = RequestsLoader()
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            zaak_url,
+            json={
+                "url": zaak_url,
+                "name": "remote",
+                "zaaktype": f"http://testserver.com{zaaktype_url}",
+            },
+        )
+
+        zaak = async_to_sync(loader.aload)(zaak_url, Zaak)
+
+    assert zaak.zaaktype == zaaktype
@@ -0,0 +1,260 @@
+import pytest
+import requests_mock
+from asgiref.sync import async_to_sync
+
+from django_loose_fk.cache import ResponseCache, default_cache
+from django_loose_fk.loaders import FetchError, RequestsLoader
+from django_loose_fk.utils import normalize_url
+from testapp.models import ZaakType
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("https://example.com/foo", "https://example.com/foo"),
+        ("HTTPS://Example.COM/foo", "https://example.com/foo"),
+        ("https://example.com:443/foo", "https://example.com/foo"),
+        ("http://example.com:80/foo", "http://example.com/foo"),
+        ("http://example.com:8000/foo", "http://example.com:8000/foo"),
+        ("https://example.com", "https://example.com/"),
+        ("https://example.com/foo?a=1#bar", "https://example.com/foo?a=1"),
+        ("http://Example.com:abc/foo", "http://example.com:abc/foo"),
+        ("http://[invalid/foo", "http://[invalid/foo"),
+    ],
+)
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_disabled_cache_is_noop():
+    cache = ResponseCache()
+    cache.set("https://example.com/foo", {"url": "https://example.com/foo"})
+
+    assert cache.get("https://example.com/foo") is None
+    assert cache.info().hits == 0
+    assert cache.info().misses == 0
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2)
+    cache.set("https://example.com/1", {"id": 1})
+    cache.set("https://example.com/2", {"id": 2})
+    # mark 1 as recently used
+    cache.get("https://example.com/1")
+
+    cache.set("https://example.com/3", {"id": 3})
+
+    assert cache.get("https://example.com/1") == {"id": 1}
+    assert cache.get("https://example.com/2") is None
+    assert cache.get("https://example.com/3") == {"id": 3}
+    assert cache.info() == (3, 1, 2, 2)
+
+
+def test_ttl_expiry(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("django_loose_fk.cache.time.time", lambda: now)
+    cache = ResponseCache(maxsize=10, timeout=60)
+    cache.set("https://example.com/1", {"id": 1})
+
+    now += 59
+    assert cache.get("https://example.com/1") == {"id": 1}
+
+    now += 1
+    assert cache.get("https://example.com/1") is None
+    assert cache.info().currsize == 0
+
+
+def test_keyed_by_normalized_url():
+    cache = ResponseCache(maxsize=10)
+    cache.set("https://example.com:443/1", {"id": 1})
+
+    assert cache.get("HTTPS://EXAMPLE.COM/1") == {"id": 1}
+
+
+def test_backend_tier(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache = ResponseCache(backend="default")
+    cache.set("https://example.com/1", {"id": 1})
+
+    # a fresh in-process cache picks up the entry from the shared backend
+    other = ResponseCache(maxsize=10, backend="default")
+
+    assert other.get("https://example.com/1") == {"id": 1}
+    assert other.info().currsize == 1
+
+
+def test_loader_uses_cache():
+    loader = RequestsLoader(cache=ResponseCache(maxsize=10))
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "https://example.com/zt/1",
+            json={"url": "https://example.com/zt/1", "name": "remote"},
+        )
+
+        first = loader.load("https://example.com/zt/1", ZaakType)
+        second = loader.load("https://example.com/zt/1", ZaakType)
+
+    assert m.call_count == 1
+    assert first.name == second.name == "remote"
+    assert loader.cache.info().hits == 1
+    assert loader.cache.info().misses == 1
+
+
+def test_loader_does_not_cache_errors():
+    loader = RequestsLoader(cache=ResponseCache(maxsize=10))
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/zt/1", status_code=500)
+
+        for _ in range(2):
+            with pytest.raises(FetchError):
+                loader.load("https://example.com/zt/1", ZaakType)
+
+    assert m.call_count == 2
+
+
+def test_default_cache_configured_from_settings(settings):
+    settings.LOOSE_FK_CACHE_MAXSIZE = 5
+    settings.LOOSE_FK_CACHE_TIMEOUT = 10
+
+    assert default_cache.maxsize == 5
+    assert default_cache.timeout == 10
+    assert default_cache.enabled
+
+
+def test_loader_without_super_init_uses_default_cache():
+    class CustomLoader(RequestsLoader):
+        def __init__(self):
+            pass
+
+    loader = CustomLoader()
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/zt/1", json={"url": "https://example.com/zt/1"})
+
+        loader.fetch_cached_object("https://example.com/zt/1")
+
+    assert loader.cache is default_cache
+    assert m.call_count == 1
+
+
+def test_stale_entry_kept_for_revalidation(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("django_loose_fk.cache.time.time", lambda: now)
+    cache = ResponseCache(maxsize=10, timeout=60, stale_timeout=100)
+    cache.set("https://example.com/1", {"id": 1}, etag='"v1"')
+    cache.set("https://example.com/2", {"id": 2})
+
+    now += 60
+    assert cache.get("https://example.com/1") is None
+    assert cache.get_entry("https://example.com/1").etag == '"v1"'
+    assert cache.get_entry("https://example.com/2") is None
+
+    now += 100
+    assert cache.get_entry("https://example.com/1") is None
+
+
+def test_loader_revalidates_with_etag(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("django_loose_fk.cache.time.time", lambda: now)
+    loader = RequestsLoader(cache=ResponseCache(maxsize=10, timeout=60))
+    url = "https://example.com/zt/1"
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            url,
+            [
+                {
+                    "json": {"url": url, "name": "remote"},
+                    "headers": {"ETag": '"v1"'},
+                },
+                {"status_code": 304},
+            ],
+        )
+
+        assert loader.load(url, ZaakType).name == "remote"
+        now += 61
+        assert loader.load(url, ZaakType).name == "remote"
+        # revalidated entry is fresh again
+        assert loader.load(url, ZaakType).name == "remote"
+
+    assert m.call_count == 2
+    assert "If-None-Match" not in m.request_history[0].headers
+    assert m.request_history[1].headers["If-None-Match"] == '"v1"'
+
+
+def test_loader_uses_overridden_fetch_object():
+    class AuthLoader(RequestsLoader):
+        def fetch_object(self, url: str) -> dict:
+            return self._get_data(
+                self.session.get(url, headers={"Authorization": "Token secret"})
+            )
+
+    loader = AuthLoader(cache=ResponseCache(maxsize=10))
+    url = "https://example.com/zt/1"
+
+    with requests_mock.Mocker() as m:
+        m.get(url, json={"url": url, "name": "remote"})
+
+        assert loader.load(url, ZaakType).name == "remote"
+        assert loader.load(url, ZaakType).name == "remote"
+
+    assert m.call_count == 1
+    assert m.last_request.headers["Authorization"] == "Token secret"
+
+
+def test_loader_revalidates_async(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("django_loose_fk.cache.time.time", lambda: now)
+    loader = RequestsLoader(cache=ResponseCache(maxsize=10, timeout=60))
+    url = "https://example.com/zt/1"
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            url,
+            [
+                {
+                    "json": {"url": url, "name": "remote"},
+                    "headers": {"ETag": '"v1"'},
+                },
+                {"status_code": 304},
+            ],
+        )
+
+        assert async_to_sync(loader.aload)(url, ZaakType).name == "remote"
+        now += 61
+        assert async_to_sync(loader.aload)(url, ZaakType).name == "remote"
+
+    assert m.call_count == 2
+    assert m.request_history[1].headers["If-None-Match"] == '"v1"'
+    assert loader.cache.info().hits == 0
+    assert loader.cache.info().misses == 2
+
+
+def test_loader_revalidates_with_last_modified(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("django_loose_fk.cache.time.time", lambda: now)
+    loader = RequestsLoader(cache=ResponseCache(maxsize=10, timeout=60))
+    url = "https://example.com/zt/1"
+    last_modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            url,
+            [
+                {
+                    "json": {"url": url, "name": "old"},
+                    "headers": {"Last-Modified": last_modified},
+                },
+                {"json": {"url": url, "name": "new"}},
+            ],
+        )
+
+        assert loader.load(url, ZaakType).name == "old"
+        now += 61
+        assert loader.load(url, ZaakType).name == "new"
+
+    assert m.request_history[1].headers["If-Modified-Since"] == last_modified
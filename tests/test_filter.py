@@ -154,3 +154,31 @@ def test_filter_with_fk_or_url_field_from_other_model(api_client):
     assert response.status_code == 200
     assert len(response.data) == 1
     assert response.data[0]["name"] == zaak_object_fk1.name
+
+
+@override_settings(ALLOWED_HOSTS=["testserver.com"])
+def test_filter_in_resolves_local_urls_in_bulk(
+    api_client, django_assert_max_num_queries
+):
+    ZaakViewSet.filterset_class = ZaakFilter
+    zaaktypen = [ZaakType.objects.create(name=i) for i in range(5)]
+    for zaaktype in zaaktypen:
+        Zaak.objects.create(name="bla", zaaktype=zaaktype)
+    urls = [
+        "http://testserver.com" + reverse("zaaktype-detail", kwargs={"pk": zaaktype.pk})
+        for zaaktype in zaaktypen[:4]
+    ]
+
+    # one query to resolve the zaaktypen, one for the zaken and one per zaak to
+    # serialize its zaaktype
+    with django_assert_max_num_queries(6):
+        response = api_client.get(
+            reverse("zaak-list"),
+            {"zaaktype__in": ",".join(urls)},
+            HTTP_HOST="testserver.com",
+        )
+
+    ZaakViewSet.filterset_class = ZaakFilterSet
+
+    assert response.status_code == 200
+    assert len(response.data) == 4
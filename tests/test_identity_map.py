@@ -0,0 +1,100 @@
+import pytest
+import requests_mock
+
+from django_loose_fk.identity_map import get_identity_map, identity_map
+from django_loose_fk.loaders import default_loader
+from django_loose_fk.middleware import IdentityMapMiddleware
+from testapp.models import Zaak, ZaakObject, ZaakType
+
+ZAAKTYPE = "https://example.com/zt/1"
+
+
+def test_no_identity_map_outside_scope():
+    assert get_identity_map() is None
+
+
+def test_nested_scopes_share_identity_map():
+    with identity_map() as outer:
+        with identity_map() as inner:
+            assert inner is outer
+
+    assert get_identity_map() is None
+
+
+def test_without_scope_each_access_fetches():
+    with requests_mock.Mocker() as m:
+        m.get(ZAAKTYPE, json={"url": ZAAKTYPE, "name": "remote"})
+
+        first = default_loader.load(ZAAKTYPE, ZaakType)
+        second = default_loader.load(ZAAKTYPE, ZaakType)
+
+    assert m.call_count == 2
+    assert first is not second
+
+
+def test_within_scope_each_url_fetched_once():
+    with requests_mock.Mocker() as m, identity_map() as objects:
+        m.get(ZAAKTYPE, json={"url": ZAAKTYPE, "name": "remote"})
+
+        first = default_loader.load(ZAAKTYPE, ZaakType)
+        second = default_loader.load("HTTPS://EXAMPLE.COM/zt/1", ZaakType)
+
+    assert m.call_count == 1
+    assert first is second
+    assert len(objects) == 1
+
+
+def test_usable_as_decorator():
+    @identity_map()
+    def task():
+        default_loader.load(ZAAKTYPE, ZaakType)
+        default_loader.load(ZAAKTYPE, ZaakType)
+        return get_identity_map()
+
+    with requests_mock.Mocker() as m:
+        m.get(ZAAKTYPE, json={"url": ZAAKTYPE, "name": "remote"})
+
+        scoped = task()
+
+    assert m.call_count == 1
+    assert len(scoped) == 1
+    assert get_identity_map() is None
+
+
+@pytest.mark.django_db
+def test_chained_access_deduplicated():
+    zaak_url = "https://example.com/zaken/1"
+    zaakobject1 = ZaakObject.objects.create(zaak=zaak_url)
+    zaakobject2 = ZaakObject.objects.create(zaak=zaak_url)
+
+    with requests_mock.Mocker() as m, identity_map():
+        m.get(zaak_url, json={"url": zaak_url, "zaaktype": ZAAKTYPE})
+        m.get(ZAAKTYPE, json={"url": ZAAKTYPE, "name": "remote"})
+
+        for zaakobject in (zaakobject1, zaakobject2):
+            assert isinstance(zaakobject.zaak, Zaak)
+            assert zaakobject.zaak.zaaktype.name == "remote"
+
+    assert m.call_count == 2
+
+
+@pytest.mark.django_db
+def test_middleware():
+    zaak = Zaak.objects.create(zaaktype=ZAAKTYPE)
+    seen = []
+
+    def get_response(request):
+        seen.append(get_identity_map())
+        return [zaak.zaaktype, zaak.zaaktype]
+
+    middleware = IdentityMapMiddleware(get_response)
+
+    with requests_mock.Mocker() as m:
+        m.get(ZAAKTYPE, json={"url": ZAAKTYPE, "name": "remote"})
+
+        first, second = middleware(None)
+
+    assert m.call_count == 1
+    assert first is second
+    assert seen[0] is not None
+    assert get_identity_map() is None
@@ -0,0 +1,97 @@
+import pytest
+import requests_mock
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
+
+from django_loose_fk.drf import FKOrURLListSerializer
+from testapp.api import ZaakSerializer
+from testapp.models import ZaakType
+
+pytestmark = pytest.mark.django_db
+
+
+class ZaakListSerializer(ZaakSerializer):
+    class Meta(ZaakSerializer.Meta):
+        list_serializer_class = FKOrURLListSerializer
+
+
+def _get_serializer(data: list) -> FKOrURLListSerializer:
+    request = APIRequestFactory().post("/")
+    return ZaakListSerializer(data=data, many=True, context={"request": request})
+
+
+def test_list_serializer_resolves_in_bulk(django_assert_num_queries):
+    zaaktypen = [ZaakType.objects.create(name=str(i)) for i in range(3)]
+    local_urls = [
+        "http://testserver" + reverse("zaaktype-detail", kwargs={"pk": zt.pk})
+        for zt in zaaktypen
+    ]
+    remote_urls = ["https://example.com/zt/1", "https://example.com/zt/2"]
+    urls = local_urls + remote_urls + remote_urls
+    serializer = _get_serializer([{"name": "zaak", "zaaktype": url} for url in urls])
+
+    with requests_mock.Mocker() as m:
+        for url in remote_urls:
+            m.get(url, json={"url": url, "name": url})
+        with django_assert_num_queries(1):
+            assert serializer.is_valid(), serializer.errors
+
+    assert m.call_count == 2
+    validated = [item["zaaktype"] for item in serializer.validated_data]
+    assert validated[:3] == zaaktypen
+    assert [obj.name for obj in validated[3:]] == remote_urls + remote_urls
+
+
+def test_list_serializer_reports_errors_per_item():
+    zaaktype = ZaakType.objects.create(name="local")
+    local_url = "http://testserver" + reverse(
+        "zaaktype-detail", kwargs={"pk": zaaktype.pk}
+    )
+    missing_url = "http://testserver" + reverse(
+        "zaaktype-detail", kwargs={"pk": zaaktype.pk + 1}
+    )
+    remote_url = "https://example.com/zt/1"
+    bad_remote_url = "https://example.com/zt/404"
+    serializer = _get_serializer(
+        [
+            {"name": "zaak", "zaaktype": local_url},
+            {"name": "zaak", "zaaktype": missing_url},
+            {"name": "zaak", "zaaktype": remote_url},
+            {"name": "zaak", "zaaktype": bad_remote_url},
+        ]
+    )
+
+    with requests_mock.Mocker() as m:
+        m.get(remote_url, json={"url": remote_url, "name": "remote"})
+        m.get(bad_remote_url, status_code=404)
+
+        assert not serializer.is_valid()
+
+    errors = serializer.errors
+    if isinstance(errors, list):  # older DRF versions
+        errors = {index: error for index, error in enumerate(errors) if error}
+    assert set(errors) == {1, 3}
+    assert errors[1]["zaaktype"][0].code == "does_not_exist"
+    assert errors[3]["zaaktype"][0].code == "bad-url"
+
+
+def test_list_serializer_fetches_every_remote_url_once():
+    good_urls = [f"https://example.com/zt/{i}" for i in range(20)]
+    bad_url = "https://example.com/zt/404"
+    serializer = _get_serializer(
+        [{"name": "zaak", "zaaktype": url} for url in good_urls + [bad_url]]
+    )
+
+    with requests_mock.Mocker() as m:
+        for url in good_urls:
+            m.get(url, json={"url": url, "name": url})
+        m.get(bad_url, status_code=404)
+
+        assert not serializer.is_valid()
+
+    assert m.call_count == 21
+    errors = serializer.errors
+    if isinstance(errors, list):  # older DRF versions
+        errors = {index: error for index, error in enumerate(errors) if error}
+    assert set(errors) == {20}
+    assert errors[20]["zaaktype"][0].code == "bad-url"
@@ -1,8 +1,22 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
 import pytest
+import requests
 import requests_mock
 
-from django_loose_fk.loaders import FetchError, FetchJsonError, default_loader
-from testapp.models import Zaak, ZaakType
+from django_loose_fk.loaders import (
+    BaseLoader,
+    FetchError,
+    FetchJsonError,
+    RequestsLoader,
+    default_loader,
+)
+from django_loose_fk.query_list import LazyQueryList
+from django_loose_fk.virtual_models import M2MHandler
+from testapp.models import TypeA, Zaak, ZaakType
 
 
 @pytest.mark.django_db
@@ -36,3 +50,252 @@ def test_is_local_url():
     assert default_loader.is_local_url("https://testserver.local:443/some-resource")
     assert default_loader.is_local_url("https://TESTSERVER.LOCAL:443/some-resource")
     assert not default_loader.is_local_url("https://example.com/some-resource")
+
+
+class SlowLoader(BaseLoader):
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def fetch_object(self, url: str) -> dict:
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        if url.endswith("error"):
+            raise FetchError(url)
+        return {"url": url, "name": url.rsplit("/", 1)[1]}
+
+
+@pytest.mark.parametrize("concurrency", [1, 2, 8])
+def test_load_many_preserves_order(settings, concurrency):
+    settings.LOOSE_FK_FETCH_CONCURRENCY = concurrency
+    loader = SlowLoader()
+    urls = [f"https://example.com/{i}" for i in range(6)]
+
+    loaded = loader.load_many(urls + urls[:2], ZaakType)
+
+    assert [obj.name for obj in loaded] == [str(i) for i in range(6)] + ["0", "1"]
+    assert loader.max_active <= concurrency
+
+
+def test_load_many_raises_first_error():
+    loader = SlowLoader()
+    urls = [
+        "https://example.com/1",
+        "https://example.com/first-error",
+        "https://example.com/second-error",
+    ]
+
+    with pytest.raises(FetchError, match="first-error"):
+        loader.load_many(urls, ZaakType)
+
+
+def test_load_many_return_exceptions():
+    loader = SlowLoader()
+    urls = [
+        "https://example.com/1",
+        "https://example.com/first-error",
+        "https://example.com/2",
+    ]
+
+    loaded = loader.load_many(urls, ZaakType, return_exceptions=True)
+
+    assert loaded[0].name == "1"
+    assert isinstance(loaded[1], FetchError)
+    assert loaded[2].name == "2"
+
+
+def test_load_many_uses_overridden_load_local_object():
+    class CustomLoader(RequestsLoader):
+        def load_local_object(self, url, model):
+            return model(name=url)
+
+    urls = ["https://testserver.com/zt/1", "https://testserver.com/zt/2"]
+
+    loaded = CustomLoader().load_many(urls, ZaakType)
+
+    assert [obj.name for obj in loaded] == urls
+
+
+def test_m2m_handler_loads_concurrently(settings):
+    settings.LOOSE_FK_FETCH_CONCURRENCY = 4
+    loader = SlowLoader()
+    urls = [f"https://example.com/{i}" for i in range(8)]
+    handler = M2MHandler("a_types", remote_model=TypeA)
+    instance = SimpleNamespace(
+        _loose_fk_data={"a_types": urls}, _loose_fk_loader=loader
+    )
+
+    result = handler.__get__(instance)
+
+    assert [obj.name for obj in result] == [str(i) for i in range(8)]
+    assert 1 < loader.max_active <= 4
+
+
+def test_requests_loader_reuses_session():
+    loader = RequestsLoader()
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/1", json={"url": "https://example.com/1"})
+        m.get("https://example.com/2", json={"url": "https://example.com/2"})
+        session = loader.session
+
+        loader.fetch_object("https://example.com/1")
+        loader.fetch_object("https://example.com/2")
+
+    assert loader.session is session
+    assert m.call_count == 2
+
+
+def test_requests_loader_session_per_thread():
+    loader = RequestsLoader()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_session = executor.submit(lambda: loader.session).result()
+
+    assert other_session is not loader.session
+    assert other_session.get_adapter("https://example.com") is loader.adapter
+    assert loader.session.get_adapter("https://example.com") is loader.adapter
+
+
+def test_requests_loader_check_object_head():
+    loader = RequestsLoader()
+
+    with requests_mock.Mocker() as m:
+        m.head("https://example.com/1")
+        m.head("https://example.com/404", status_code=404)
+
+        loader.check_object("https://example.com/1")
+        with pytest.raises(FetchError):
+            loader.check_object("https://example.com/404")
+
+    assert [request.method for request in m.request_history] == ["HEAD", "HEAD"]
+
+
+def test_requests_loader_check_object_overridden_fetch_object():
+    class AuthLoader(RequestsLoader):
+        def fetch_object(self, url: str) -> dict:
+            return self._get_data(
+                self.session.get(url, headers={"Authorization": "Token secret"})
+            )
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/1", json={"url": "https://example.com/1"})
+
+        AuthLoader().check_object("https://example.com/1")
+
+    assert m.call_count == 1
+    assert m.last_request.method == "GET"
+    assert m.last_request.headers["Authorization"] == "Token secret"
+
+
+def test_requests_loader_timeout(settings):
+    settings.LOOSE_FK_REQUESTS_TIMEOUT = (1, 2)
+    loader = RequestsLoader()
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/1", json={"url": "https://example.com/1"})
+
+        loader.fetch_object("https://example.com/1")
+
+    assert m.last_request.timeout == (1, 2)
+
+
+@pytest.mark.parametrize(
+    "exc", [requests.exceptions.ConnectTimeout, requests.exceptions.ConnectionError]
+)
+def test_requests_loader_connection_errors(exc):
+    loader = RequestsLoader()
+
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/1", exc=exc)
+
+        with pytest.raises(FetchError):
+            loader.fetch_object("https://example.com/1")
+
+
+def test_requests_loader_session_configuration(settings):
+    settings.LOOSE_FK_REQUESTS_POOL_SIZE = 4
+    settings.LOOSE_FK_REQUESTS_RETRIES = 3
+    settings.LOOSE_FK_REQUESTS_BACKOFF_FACTOR = 0.1
+
+    adapter = RequestsLoader().session.get_adapter("https://example.com")
+
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 3
+    assert adapter.max_retries.backoff_factor == 0.1
+
+
+def test_default_loader_reset_on_requests_settings(settings):
+    session = default_loader.session
+
+    settings.LOOSE_FK_REQUESTS_TIMEOUT = 1
+
+    assert default_loader.session is not session
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("https://example.com/some-resource", True),
+        ("https://sub.example.com/some-resource", True),
+        ("https://EXAMPLE.com:8000/some-resource", True),
+        ("https://otherexample.com/some-resource", False),
+        ("https://testserver.com/some-resource", True),
+        ("https://testserver.local/some-resource", False),
+    ],
+)
+def test_is_local_url_subdomain_patterns(settings, url, expected):
+    settings.ALLOWED_HOSTS = [".example.com", "testserver.com"]
+
+    assert default_loader.is_local_url(url) is expected
+
+
+def test_is_local_url_base_urls(settings):
+    settings.LOOSE_FK_LOCAL_BASE_URLS = ["https://testserver.com/api/"]
+
+    assert default_loader.is_local_url("https://testserver.com/api/zaken/1")
+    assert not default_loader.is_local_url("https://testserver.com/other/zaken/1")
+
+
+def test_is_local_url_rebuilt_on_setting_change(settings):
+    assert not default_loader.is_local_url("https://example.com/some-resource")
+
+    settings.ALLOWED_HOSTS = ["example.com"]
+
+    assert default_loader.is_local_url("https://example.com/some-resource")
+
+
+def test_is_local_url_wildcard_warns_once(settings):
+    settings.ALLOWED_HOSTS = ["*"]
+
+    with pytest.warns(RuntimeWarning) as record:
+        assert default_loader.is_local_url("https://example.com/1")
+        assert default_loader.is_local_url("https://example.com/2")
+
+    assert len(record) == 1
+
+
+def test_m2m_handler_lazy(settings):
+    settings.LOOSE_FK_LAZY_M2M = True
+    settings.LOOSE_FK_FETCH_CONCURRENCY = 4
+    loader = SlowLoader()
+    urls = [f"https://example.com/{i}" for i in range(8)]
+    handler = M2MHandler("a_types", remote_model=TypeA)
+    instance = SimpleNamespace(
+        _loose_fk_data={"a_types": urls}, _loose_fk_loader=loader
+    )
+
+    result = handler.__get__(instance)
+
+    assert isinstance(result, LazyQueryList)
+    assert result.count() == 8
+    assert urls[3] in result
+    assert loader.max_active == 0
+    assert [obj.name for obj in result] == [str(i) for i in range(8)]
+    assert 1 < loader.max_active <= 4
@@ -1,4 +1,9 @@
-from testapp.models import DummyModel
+from django.db import connection
+
+import pytest
+
+from django_loose_fk.indexes import FkOrURLFieldIndex
+from testapp.models import DummyModel, Zaak, ZaakObject
 
 
 def test_model_multiple_loose_fk_fields():
@@ -7,3 +12,38 @@ def test_model_multiple_loose_fk_fields():
 
     assert len(constraints) == 1
     assert len(names) == 1
+
+
+def test_url_index_added():
+    indexes = [
+        index
+        for index in ZaakObject._meta.indexes
+        if isinstance(index, FkOrURLFieldIndex)
+    ]
+
+    assert len(indexes) == 1
+    assert indexes[0].url_field == "extern_zaak"
+    assert indexes[0].name
+    assert not any(isinstance(index, FkOrURLFieldIndex) for index in Zaak._meta.indexes)
+
+
+def test_url_index_deconstruct():
+    index = FkOrURLFieldIndex(url_field="extern_zaak", name="some_idx")
+
+    path, args, kwargs = index.deconstruct()
+
+    assert path == "django_loose_fk.indexes.FkOrURLFieldIndex"
+    assert kwargs == {"url_field": "extern_zaak", "name": "some_idx"}
+    assert index.clone().url_field == "extern_zaak"
+
+
+@pytest.mark.parametrize("partial", [True, False])
+def test_url_index_sql(partial, monkeypatch):
+    monkeypatch.setattr(connection.features, "supports_partial_indexes", partial)
+    index = FkOrURLFieldIndex(url_field="extern_zaak", name="some_idx")
+    editor = connection.schema_editor(collect_sql=True)
+
+    sql = str(index.create_sql(ZaakObject, editor))
+
+    assert "extern_zaak" in sql
+    assert ("WHERE" in sql) is partial
@@ -0,0 +1,110 @@
+import pytest
+import requests_mock
+
+from django_loose_fk.loaders import FetchError
+from django_loose_fk.prefetch import prefetch_loose_fk
+from testapp.models import Zaak, ZaakObject, ZaakType
+
+pytestmark = pytest.mark.django_db
+
+ZAAKTYPE1 = "https://example.com/zt/1"
+ZAAKTYPE2 = "https://example.com/zt/2"
+
+
+@pytest.fixture
+def zaken():
+    local1 = ZaakType.objects.create(name="local1")
+    local2 = ZaakType.objects.create(name="local2")
+    Zaak.objects.create(name="1", zaaktype=local1)
+    Zaak.objects.create(name="2", zaaktype=local2)
+    Zaak.objects.create(name="3", zaaktype=ZAAKTYPE1)
+    Zaak.objects.create(name="4", zaaktype=ZAAKTYPE1)
+    Zaak.objects.create(name="5", zaaktype=ZAAKTYPE2)
+
+
+def test_prefetch_queryset(zaken, django_assert_num_queries):
+    with requests_mock.Mocker() as m:
+        m.get(ZAAKTYPE1, json={"url": ZAAKTYPE1, "name": "remote1"})
+        m.get(ZAAKTYPE2, json={"url": ZAAKTYPE2, "name": "remote2"})
+
+        # one query for the zaken, one for the local zaaktypen
+        with django_assert_num_queries(2):
+            zaken = list(Zaak.objects.prefetch_loose_fk("zaaktype").order_by("name"))
+            names = [zaak.zaaktype.name for zaak in zaken]
+
+    assert names == ["local1", "local2", "remote1", "remote1", "remote2"]
+    assert m.call_count == 2
+    assert zaken[2].zaaktype is zaken[3].zaaktype
+
+
+def test_prefetch_instances(zaken):
+    zaken = list(Zaak.objects.filter(extern_zaaktype__gt=""))
+
+    with requests_mock.Mocker() as m:
+        m.get(ZAAKTYPE1, json={"url": ZAAKTYPE1, "name": "remote1"})
+        m.get(ZAAKTYPE2, json={"url": ZAAKTYPE2, "name": "remote2"})
+
+        prefetch_loose_fk(zaken, "zaaktype")
+
+    assert m.call_count == 2
+    assert {zaak.zaaktype.name for zaak in zaken} == {"remote1", "remote2"}
+
+
+def test_prefetch_cleared():
+    qs = Zaak.objects.prefetch_loose_fk("zaaktype").prefetch_loose_fk(None)
+
+    assert qs._prefetch_loose_fk_lookups == ()
+
+
+def test_prefetch_values_queryset_ignored(zaken):
+    values = list(Zaak.objects.prefetch_loose_fk("zaaktype").values_list("name"))
+
+    assert len(values) == 5
+
+
+def test_prefetch_invalid_field(zaken):
+    with pytest.raises(ValueError):
+        prefetch_loose_fk(Zaak.objects.all(), "name")
+
+
+def test_cache_invalidated_on_url_change():
+    zaak = Zaak.objects.create(zaaktype=ZAAKTYPE1)
+
+    with requests_mock.Mocker() as m:
+        m.get(ZAAKTYPE1, json={"url": ZAAKTYPE1, "name": "remote1"})
+        m.get(ZAAKTYPE2, json={"url": ZAAKTYPE2, "name": "remote2"})
+
+        assert zaak.zaaktype.name == "remote1"
+        assert zaak.zaaktype.name == "remote1"
+        zaak.zaaktype = ZAAKTYPE2
+        assert zaak.zaaktype.name == "remote2"
+
+    assert m.call_count == 2
+
+
+def test_prefetch_without_values(django_assert_num_queries):
+    zaak = Zaak.objects.create(zaaktype=ZAAKTYPE1)
+    ZaakObject.objects.create(zaak=zaak)
+
+    # one query for the zaakobjecten, one for the local zaken
+    with django_assert_num_queries(2):
+        zaakobjecten = list(ZaakObject.objects.all())
+        prefetch_loose_fk(zaakobjecten, "zaak")
+        assert zaakobjecten[0].zaak == zaak
+
+    with django_assert_num_queries(0):
+        prefetch_loose_fk([], "zaak")
+
+
+def test_prefetch_failing_url(zaken):
+    with requests_mock.Mocker() as m:
+        m.get(ZAAKTYPE1, status_code=500)
+        m.get(ZAAKTYPE2, json={"url": ZAAKTYPE2, "name": "remote2"})
+
+        zaken = list(Zaak.objects.prefetch_loose_fk("zaaktype").order_by("name"))
+
+        assert zaken[4].zaaktype.name == "remote2"
+        with pytest.raises(FetchError):
+            zaken[2].zaaktype
+
+    assert m.call_count == 3
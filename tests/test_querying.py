@@ -2,9 +2,15 @@
 Test the ORM queries against the virtual field.
 """
 
+from unittest.mock import patch
+
+from django.db import connection
+
 import pytest
 import requests_mock
+from rest_framework.reverse import reverse
 
+from testapp.api import ZaakTypeViewSet
 from testapp.models import Zaak, ZaakType
 
 pytestmark = pytest.mark.django_db
@@ -102,6 +108,23 @@ def test_in_lookup_mixed_local_remote():
     assert list(qs) == [zaak1, zaak2]
 
 
+def test_in_lookup_chunked(monkeypatch):
+    monkeypatch.setattr(connection.ops, "max_in_list_size", lambda: 2)
+    local_zaaktypes = [ZaakType.objects.create(name=str(i)) for i in range(3)]
+    urls = [f"https://example.com/zt/{i}" for i in range(3)]
+    zaken = [Zaak.objects.create(zaaktype=value) for value in local_zaaktypes + urls]
+    Zaak.objects.create(zaaktype="https://example.com/zt/other")
+    Zaak.objects.create(zaaktype=ZaakType.objects.create(name="other"))
+
+    qs = Zaak.objects.filter(zaaktype__in=urls + local_zaaktypes).order_by("pk")
+
+    assert list(qs) == zaken
+    # two chunks for both the URLs and FKs
+    assert str(qs.query).count(" IN (") == 4
+
+    assert list(qs.exclude(zaaktype__in=urls)) == zaken[:3]
+
+
 def test_exact_lookup_local_fk():
     local_zaaktype = ZaakType.objects.create(name="local")
     zaak1 = Zaak.objects.create(zaaktype=local_zaaktype)
@@ -136,3 +159,116 @@ def test_exact_lookup_with_virtual_model():
     qs = Zaak.objects.filter(zaaktype=zaaktype)
 
     assert list(qs) == [zaak2]
+
+
+def test_in_lookup_postgres_arrays(settings):
+    settings.LOOSE_FK_POSTGRES_ARRAY_IN = True
+    local_zaaktype = ZaakType.objects.create(name="local")
+    urls = [f"https://example.com/zt/{i}" for i in range(3)]
+    qs = Zaak.objects.filter(zaaktype__in=urls + [local_zaaktype])
+    lookup = qs.query.where.children[0]
+
+    sql, params = lookup.as_postgresql(qs.query.get_compiler("default"), connection)
+
+    assert sql.count("= ANY(%s::") == 2
+    assert "::text[]" in sql
+    assert params == (urls, [local_zaaktype.pk])
+
+
+def test_in_lookup_postgres_arrays_disabled():
+    qs = Zaak.objects.filter(zaaktype__in=["https://example.com/zt/1"])
+    lookup = qs.query.where.children[0]
+    compiler = qs.query.get_compiler("default")
+
+    assert lookup.as_postgresql(compiler, connection) == lookup.as_sql(
+        compiler, connection
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Array parameters are PostgreSQL only"
+)
+def test_in_lookup_postgres_arrays_evaluated(settings):
+    settings.LOOSE_FK_POSTGRES_ARRAY_IN = True
+    local_zaaktype1 = ZaakType.objects.create(name="local1")
+    local_zaaktype2 = ZaakType.objects.create(name="local2")
+    other_zaaktype = ZaakType.objects.create(name="other")
+    zaak1 = Zaak.objects.create(zaaktype=local_zaaktype1)
+    zaak2 = Zaak.objects.create(zaaktype=local_zaaktype2)
+    zaak3 = Zaak.objects.create(zaaktype="https://example.com/zt/1")
+    Zaak.objects.create(zaaktype=other_zaaktype)
+    Zaak.objects.create(zaaktype="https://example.com/zt/other")
+
+    qs = Zaak.objects.filter(
+        zaaktype__in=[
+            local_zaaktype1,
+            _get_local_url(local_zaaktype2),
+            "https://example.com/zt/1",
+            "https://example.com/zt/2",
+        ]
+    ).order_by("pk")
+
+    assert list(qs) == [zaak1, zaak2, zaak3]
+
+
+def _get_local_url(zaaktype: ZaakType) -> str:
+    path = reverse("zaaktype-detail", kwargs={"pk": zaaktype.pk})
+    return f"http://testserver.com{path}"
+
+
+def test_exact_lookup_with_local_url(django_assert_num_queries):
+    local_zaaktype = ZaakType.objects.create(name="local")
+    zaak1 = Zaak.objects.create(zaaktype=local_zaaktype)
+    Zaak.objects.create(zaaktype=ZaakType.objects.create(name="other"))
+    Zaak.objects.create(zaaktype="https://example.com/zt/123")
+
+    # the pk is taken from the URL, the zaaktype is not retrieved
+    with django_assert_num_queries(1):
+        zaken = list(Zaak.objects.filter(zaaktype=_get_local_url(local_zaaktype)))
+
+    assert zaken == [zaak1]
+
+
+def test_exact_lookup_with_local_url_stored_as_url():
+    local_zaaktype = ZaakType.objects.create(name="local")
+    local_url = _get_local_url(local_zaaktype)
+    zaak1 = Zaak.objects.create(zaaktype=local_zaaktype)
+    zaak2 = Zaak.objects.create(zaaktype=local_url)
+    zaak3 = Zaak.objects.create(zaaktype="https://example.com/zt/123")
+
+    qs = Zaak.objects.filter(zaaktype=local_url).order_by("pk")
+
+    assert list(qs) == [zaak1, zaak2]
+    assert list(Zaak.objects.exclude(zaaktype=local_url)) == [zaak3]
+
+
+def test_exact_lookup_with_local_url_viewset_queryset():
+    local_zaaktype = ZaakType.objects.create(name="local")
+    hidden_zaaktype = ZaakType.objects.create(name="hidden")
+    zaak1 = Zaak.objects.create(zaaktype=local_zaaktype)
+    Zaak.objects.create(zaaktype=hidden_zaaktype)
+
+    with patch.object(
+        ZaakTypeViewSet,
+        "get_queryset",
+        lambda viewset: ZaakType.objects.filter(name="local"),
+    ):
+        qs = Zaak.objects.filter(zaaktype=_get_local_url(local_zaaktype))
+        hidden_qs = Zaak.objects.filter(zaaktype=_get_local_url(hidden_zaaktype))
+
+    assert list(qs) == [zaak1]
+    assert list(hidden_qs) == []
+
+
+def test_in_lookup_with_local_url():
+    local_zaaktype1 = ZaakType.objects.create(name="local1")
+    local_zaaktype2 = ZaakType.objects.create(name="local2")
+    zaak1 = Zaak.objects.create(zaaktype=local_zaaktype1)
+    Zaak.objects.create(zaaktype=local_zaaktype2)
+    zaak3 = Zaak.objects.create(zaaktype="https://example.com/zt/123")
+
+    qs = Zaak.objects.filter(
+        zaaktype__in=[_get_local_url(local_zaaktype1), "https://example.com/zt/123"]
+    ).order_by("pk")
+
+    assert list(qs) == [zaak1, zaak3]
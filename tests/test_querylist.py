@@ -1,6 +1,11 @@
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldError
+from django.db.models import Q
+
 import pytest
 
-from django_loose_fk.query_list import QueryList, is_url
+from django_loose_fk.query_list import LazyQueryList, QueryList, is_url
 
 
 @pytest.mark.parametrize(
@@ -42,3 +47,152 @@ def test_querylist_count():
     ql = QueryList(["foo", "bar"])
 
     assert ql.count() == 2
+
+
+def _get_query_list() -> QueryList:
+    return QueryList(
+        [
+            SimpleNamespace(name="foo", number=2, parent=SimpleNamespace(name="a")),
+            SimpleNamespace(name="Bar", number=1, parent=None),
+            SimpleNamespace(name="baz", number=None, parent=SimpleNamespace(name="b")),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "filters,expected",
+    [
+        ({"name": "foo"}, ["foo"]),
+        ({"name__iexact": "bar"}, ["Bar"]),
+        ({"name__in": ["foo", "baz"]}, ["foo", "baz"]),
+        ({"name__icontains": "A"}, ["Bar", "baz"]),
+        ({"number__gt": 1}, ["foo"]),
+        ({"number__lte": 2}, ["foo", "Bar"]),
+        ({"number__isnull": True}, ["baz"]),
+        ({"parent__name": "b"}, ["baz"]),
+        ({"parent__isnull": True}, ["Bar"]),
+    ],
+)
+def test_querylist_filter(filters, expected):
+    ql = _get_query_list().filter(**filters)
+
+    assert ql.values_list("name", flat=True) == expected
+
+
+def test_querylist_filter_q_objects():
+    ql = _get_query_list()
+
+    assert ql.filter(Q(name="foo") | Q(number=1)).values_list("name", flat=True) == [
+        "foo",
+        "Bar",
+    ]
+    assert ql.exclude(name__startswith="b").values_list("name", flat=True) == [
+        "foo",
+        "Bar",
+    ]
+
+
+def test_querylist_filter_without_conditions():
+    ql = _get_query_list()
+    names = ["foo", "Bar", "baz"]
+
+    assert ql.filter().values_list("name", flat=True) == names
+    assert ql.exclude().values_list("name", flat=True) == names
+    assert ql.exclude(Q()).values_list("name", flat=True) == names
+    assert ql.exclude(Q(), name="foo").values_list("name", flat=True) == names[1:]
+
+
+def test_querylist_filter_unknown_field():
+    with pytest.raises(FieldError):
+        _get_query_list().filter(foo="bar")
+
+
+def test_querylist_order_by():
+    ql = _get_query_list()
+
+    assert ql.order_by("number").values_list("name", "number") == [
+        ("Bar", 1),
+        ("foo", 2),
+        ("baz", None),
+    ]
+    assert ql.order_by("-number").values_list("name", flat=True) == [
+        "baz",
+        "foo",
+        "Bar",
+    ]
+    assert ql.order_by("parent__name", "name").values_list("name", flat=True) == [
+        "foo",
+        "baz",
+        "Bar",
+    ]
+
+
+def test_querylist_slicing():
+    ql = _get_query_list()
+
+    assert ql[0].name == "foo"
+    assert isinstance(ql[1:], QueryList)
+    assert ql[1:].values_list("name", flat=True) == ["Bar", "baz"]
+
+
+def test_querylist_containment_url_index():
+    items = [SimpleNamespace(), SimpleNamespace()]
+    ql = QueryList(items, urls=["https://example.com/1", "https://example.com/2"])
+
+    assert "https://example.com/2" in ql
+    assert "https://example.com/3" not in ql
+    assert "https://example.com/1" in ql.filter()[:1]
+    assert "https://example.com/2" not in ql.filter()[:1]
+
+
+class RecordingLoader:
+    def __init__(self):
+        self.batches = []
+
+    def load_many(self, urls):
+        self.batches.append(urls)
+        return [SimpleNamespace(url=url) for url in urls]
+
+
+def test_lazy_querylist_without_loading():
+    loader = RecordingLoader()
+    urls = [f"https://example.com/{i}" for i in range(5)]
+    ql = LazyQueryList(urls, load_many=loader.load_many, batch_size=2)
+
+    assert ql.count() == 5
+    assert len(ql) == 5
+    assert "https://example.com/3" in ql
+    assert "https://example.com/5" not in ql
+    assert "LazyQueryList" in repr(ql)
+    assert loader.batches == []
+
+
+def test_lazy_querylist_loads_in_batches():
+    loader = RecordingLoader()
+    urls = [f"https://example.com/{i}" for i in range(5)]
+    ql = LazyQueryList(urls, load_many=loader.load_many, batch_size=2)
+
+    assert ql.first().url == urls[0]
+    assert loader.batches == [urls[:2]]
+
+    assert [item.url for item in ql] == urls
+    assert loader.batches == [urls[:2], urls[2:4], urls[4:]]
+
+    # loaded items are reused
+    assert ql[-1].url == urls[4]
+    assert ql.filter(url=urls[1]).values_list("url", flat=True) == [urls[1]]
+    assert len(loader.batches) == 3
+
+
+def test_lazy_querylist_slicing():
+    loader = RecordingLoader()
+    urls = [f"https://example.com/{i}" for i in range(5)]
+    ql = LazyQueryList(urls, load_many=loader.load_many, batch_size=10)
+
+    sliced = ql[1:3]
+
+    assert isinstance(sliced, LazyQueryList)
+    assert sliced.count() == 2
+    assert loader.batches == []
+    assert [item.url for item in sliced] == urls[1:3]
+    assert loader.batches == [urls[1:3]]
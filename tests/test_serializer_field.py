@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from rest_framework.serializers import ModelSerializer
 
 from testapp.models import DummyModel
@@ -23,3 +25,33 @@ def test_blankable_nullable_field():
 
     assert field.required is False
     assert field.allow_null is True
+
+
+def test_field_introspection_cached_per_serializer_class():
+    field1 = Serializer().fields["zaaktype1"]
+    field2 = Serializer().fields["zaaktype1"]
+
+    assert field1._get_model_and_field() is field2._get_model_and_field()
+
+    field1._field_instance
+    with patch.object(Serializer, "build_field") as build_field:
+        field_instance = field2._field_instance
+
+    build_field.assert_not_called()
+    assert field_instance is not field1._field_instance
+    assert field_instance.parent is field2.parent
+
+
+def test_field_introspection_cache_keyed_by_extra_kwargs():
+    class ContextSerializer(Serializer):
+        def get_extra_kwargs(self):
+            extra_kwargs = super().get_extra_kwargs()
+            if self.context.get("read_only"):
+                extra_kwargs["zaaktype1"] = {"read_only": True}
+            return extra_kwargs
+
+    field1 = ContextSerializer().fields["zaaktype1"]._field_instance
+    field2 = ContextSerializer(context={"read_only": True}).fields["zaaktype1"]
+
+    assert field1.read_only is False
+    assert field2._field_instance.read_only is True
@@ -0,0 +1,127 @@
+from django.db import connection, models
+from django.test.utils import isolate_apps
+
+import pytest
+
+from django_loose_fk.fields import FkOrURLField
+from testapp.models import Zaak, ZaakObject2, ZaakType
+
+ZAAK = "https://example.com/zaken/1"
+
+
+def test_url_hash_is_64_bit_integer():
+    field = ZaakObject2._meta.get_field("zaak")
+
+    url_hash = field.get_url_hash(ZAAK)
+
+    assert isinstance(url_hash, int)
+    assert -(2**63) <= url_hash < 2**63
+    assert field.get_url_hash("HTTPS://EXAMPLE.COM:443/zaken/1") == url_hash
+    assert field.get_url_hash("") is None
+
+
+def test_url_hash_set_with_descriptor():
+    zaakobject = ZaakObject2(zaak=ZAAK)
+
+    assert zaakobject.extern_zaak_hash == ZaakObject2.zaak.field.get_url_hash(ZAAK)
+
+
+@pytest.mark.django_db
+def test_url_hash_synced_on_save():
+    zaakobject = ZaakObject2.objects.create(zaak=ZAAK)
+    zaakobject.extern_zaak = "https://example.com/zaken/2"
+    zaakobject.save()
+    zaakobject.refresh_from_db()
+
+    field = ZaakObject2.zaak.field
+    assert zaakobject.extern_zaak_hash == field.get_url_hash(
+        "https://example.com/zaken/2"
+    )
+
+    zaakobject.zaak = Zaak.objects.create(zaaktype=ZaakType.objects.create())
+    zaakobject.extern_zaak = ""
+    zaakobject.save()
+    zaakobject.refresh_from_db()
+
+    assert zaakobject.extern_zaak_hash is None
+
+
+@pytest.mark.django_db
+def test_exact_lookup_filters_on_hash():
+    zaakobject = ZaakObject2.objects.create(zaak=ZAAK)
+    ZaakObject2.objects.create(zaak="https://example.com/zaken/2")
+
+    qs = ZaakObject2.objects.filter(zaak=ZAAK)
+
+    assert list(qs) == [zaakobject]
+    assert '"extern_zaak_hash" =' in str(qs.query)
+
+
+@pytest.mark.django_db
+def test_in_lookup_filters_on_hash():
+    local_zaak = Zaak.objects.create(zaaktype=ZaakType.objects.create())
+    zaakobject1 = ZaakObject2.objects.create(zaak=ZAAK)
+    zaakobject2 = ZaakObject2.objects.create(zaak=local_zaak)
+    ZaakObject2.objects.create(zaak="https://example.com/zaken/2")
+
+    qs = ZaakObject2.objects.filter(zaak__in=[ZAAK, local_zaak]).order_by("pk")
+
+    assert list(qs) == [zaakobject1, zaakobject2]
+    assert '"extern_zaak_hash" IN' in str(qs.query)
+
+
+@pytest.mark.django_db
+def test_lookups_match_rows_without_hash():
+    ZaakObject2.objects.bulk_create([ZaakObject2(extern_zaak=ZAAK)])
+    zaakobject = ZaakObject2.objects.get()
+    assert zaakobject.extern_zaak_hash is None
+
+    assert list(ZaakObject2.objects.filter(zaak=ZAAK)) == [zaakobject]
+    assert list(ZaakObject2.objects.filter(zaak__in=[ZAAK])) == [zaakobject]
+    assert not ZaakObject2.objects.exclude(zaak=ZAAK).exists()
+
+
+@pytest.mark.django_db
+def test_in_lookup_postgres_arrays_filters_on_hash(settings):
+    settings.LOOSE_FK_POSTGRES_ARRAY_IN = True
+    urls = [ZAAK, "https://example.com/zaken/2"]
+    qs = ZaakObject2.objects.filter(zaak__in=urls)
+    lookup = qs.query.where.children[0]
+
+    sql, params = lookup.as_postgresql(qs.query.get_compiler("default"), connection)
+
+    field = ZaakObject2.zaak.field
+    assert '"extern_zaak_hash" = ANY(%s::bigint[])' in sql
+    assert '"extern_zaak_hash" IS NULL' in sql
+    assert params == ([field.get_url_hash(url) for url in urls], urls, [])
+
+
+@isolate_apps("testapp")
+def test_url_hash_field_checks():
+    class Model(models.Model):
+        _zaak = models.ForeignKey("Zaak", null=True, on_delete=models.PROTECT)
+        extern_zaak = models.URLField(blank=True)
+        too_short = models.CharField(max_length=32, null=True)
+        not_null = models.CharField(max_length=64)
+        valid = models.CharField(max_length=64, null=True)
+
+        class Meta:
+            app_label = "testapp"
+
+    def check(url_hash_field):
+        field = FkOrURLField(
+            fk_field="_zaak", url_field="extern_zaak", url_hash_field=url_hash_field
+        )
+        field.model = Model
+        return [error.id for error in field.check()]
+
+    assert check("too_short") == ["fk_or_url_field.E004"]
+    assert check("not_null") == ["fk_or_url_field.E005"]
+    assert check("valid") == []
+
+    field = FkOrURLField(
+        fk_field="_zaak", url_field="extern_zaak", url_hash_field="valid"
+    )
+    field.model = Model
+    # character fields hold the hex digest
+    assert len(field.get_url_hash(ZAAK)) == 64
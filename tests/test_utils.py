@@ -0,0 +1,99 @@
+from unittest.mock import patch
+
+from django.core.exceptions import ObjectDoesNotExist
+
+import pytest
+from rest_framework.reverse import reverse
+
+from django_loose_fk.utils import (
+    ViewSetMetadata,
+    clear_viewset_cache,
+    get_resource_for_path,
+    get_resources_for_paths,
+    resolve_viewset,
+)
+from testapp.api import ZaakTypeViewSet
+from testapp.models import Zaak, ZaakType
+
+pytestmark = pytest.mark.django_db
+
+
+def test_get_resources_for_paths_single_query_per_viewset(django_assert_num_queries):
+    zaaktypen = [ZaakType.objects.create(name=str(i)) for i in range(3)]
+    zaak = Zaak.objects.create(name="zaak", zaaktype=zaaktypen[0])
+    paths = [reverse("zaaktype-detail", kwargs={"pk": zt.pk}) for zt in zaaktypen]
+    zaak_path = reverse("zaak-detail", kwargs={"pk": zaak.pk})
+
+    with django_assert_num_queries(2):
+        resources = get_resources_for_paths(
+            [paths[2], zaak_path, paths[0], paths[1], paths[2]]
+        )
+
+    assert resources == [zaaktypen[2], zaak, zaaktypen[0], zaaktypen[1], zaaktypen[2]]
+
+
+def test_get_resources_for_paths_missing():
+    zaaktype = ZaakType.objects.create(name="zt")
+    path = reverse("zaaktype-detail", kwargs={"pk": zaaktype.pk})
+    missing_path = reverse("zaaktype-detail", kwargs={"pk": zaaktype.pk + 1})
+
+    with pytest.raises(ZaakType.DoesNotExist):
+        get_resources_for_paths([path, missing_path])
+
+    with pytest.raises(ObjectDoesNotExist):
+        get_resources_for_paths([path, "/non-existent"])
+
+    resources = get_resources_for_paths(
+        [path, missing_path, "/non-existent", "/zaaktypes/not-a-pk"], missing_ok=True
+    )
+
+    assert resources == [zaaktype, None, None, None]
+
+
+def test_viewset_metadata_cached():
+    zaaktype = ZaakType.objects.create(name="zt")
+    path = reverse("zaaktype-detail", kwargs={"pk": zaaktype.pk})
+
+    match1, metadata1 = resolve_viewset(path)
+    match2, metadata2 = resolve_viewset(path)
+
+    assert metadata1 is metadata2
+    assert metadata1.viewset_class is ZaakTypeViewSet
+    assert metadata1.lookup_field == "pk"
+    assert metadata1.lookup_url_kwarg == "pk"
+    assert match1.kwargs == {"pk": str(zaaktype.pk)}
+
+    clear_viewset_cache()
+
+    assert resolve_viewset(path)[1] is not metadata1
+
+
+def test_get_resource_for_path_without_viewset_instance(django_assert_num_queries):
+    zaaktype = ZaakType.objects.create(name="zt")
+    path = reverse("zaaktype-detail", kwargs={"pk": zaaktype.pk})
+
+    with patch.object(ZaakTypeViewSet, "__init__") as init:
+        with django_assert_num_queries(1):
+            assert get_resource_for_path(path) == zaaktype
+
+    init.assert_not_called()
+
+
+class FilteredViewSet(ZaakTypeViewSet):
+    lookup_field = "name"
+
+    def get_queryset(self):
+        return super().get_queryset().exclude(name="hidden")
+
+
+def test_viewset_metadata_custom_get_queryset():
+    ZaakType.objects.create(name="visible")
+    ZaakType.objects.create(name="hidden")
+    metadata = ViewSetMetadata.from_callback(
+        FilteredViewSet.as_view({"get": "retrieve"})
+    )
+
+    assert metadata.base_queryset is None
+    assert metadata.lookup_url_kwarg == "name"
+    queryset = metadata.get_queryset((), {"name": "visible"})
+    assert [zt.name for zt in queryset] == ["visible"]
@@ -0,0 +1,127 @@
+import uuid
+
+from django_loose_fk.loaders import RequestsLoader, default_loader
+from django_loose_fk.virtual_models import (
+    ProxyMixin,
+    get_conversion_plan,
+    get_model_instance,
+    get_model_instances,
+    virtual_model_factory,
+)
+from testapp.models import B, TypeB, ZaakType
+
+
+def test_conversion_plan_skips_identity_converters():
+    plan = dict(get_conversion_plan(TypeB))
+
+    assert set(plan) == {"name", "a_types", "uuid"}
+    assert plan["uuid"] is not None
+    assert plan["name"] is not None
+    # ManyToManyField doesn't convert its input
+    assert plan["a_types"] is None
+
+
+def test_conversion_plan_cached():
+    assert get_conversion_plan(TypeB) is get_conversion_plan(TypeB)
+
+
+def test_get_model_instance_converts_values():
+    uuid_value = uuid.uuid4()
+    data = {"url": "https://example.com/b/1", "name": "b", "uuid": str(uuid_value)}
+
+    instance = get_model_instance(TypeB, data, loader=default_loader)
+
+    assert isinstance(instance, ProxyMixin)
+    assert instance.uuid == uuid_value
+    assert instance._initial_data is data
+
+
+def test_get_model_instances_bulk():
+    payloads = [
+        {"url": f"https://example.com/zt/{i}", "name": f"zaaktype {i}", "extra": 1}
+        for i in range(3)
+    ]
+
+    instances = get_model_instances(ZaakType, payloads, loader=default_loader)
+
+    assert [instance.name for instance in instances] == [
+        "zaaktype 0",
+        "zaaktype 1",
+        "zaaktype 2",
+    ]
+    assert [instance._loose_fk_data["url"] for instance in instances] == [
+        payload["url"] for payload in payloads
+    ]
+
+
+def test_lazy_virtual_model_defers_conversion(settings):
+    settings.LOOSE_FK_LAZY_VIRTUAL_MODELS = True
+    uuid_value = uuid.uuid4()
+    data = {
+        "url": "https://example.com/b/1",
+        "name": "b",
+        "uuid": str(uuid_value),
+        "a_types": ["https://example.com/a/1"],
+    }
+
+    instance = get_model_instance(TypeB, data, loader=default_loader)
+
+    assert instance.get_deferred_fields() == {"name", "uuid"}
+    assert instance._loose_fk_data["a_types"] == ["https://example.com/a/1"]
+    assert instance.pk is None
+
+    assert instance.uuid == uuid_value
+    assert instance.get_deferred_fields() == {"name"}
+    assert instance.name == "b"
+    assert instance.get_deferred_fields() == set()
+
+
+def test_lazy_virtual_model_missing_values_use_defaults(settings):
+    settings.LOOSE_FK_LAZY_VIRTUAL_MODELS = True
+
+    instance = get_model_instance(
+        ZaakType, {"url": "https://example.com/zt/1"}, loader=default_loader
+    )
+
+    assert instance.name == ""
+    assert instance._loose_fk_data["url"] == "https://example.com/zt/1"
+
+
+def test_lazy_virtual_model_chained_loose_fk(settings):
+    settings.LOOSE_FK_LAZY_VIRTUAL_MODELS = True
+    data = {"url": "https://example.com/b/1", "type": "https://example.com/type-b/1"}
+
+    instance = get_model_instance(B, data, loader=default_loader)
+
+    assert instance.remote_type == "https://example.com/type-b/1"
+    assert instance.local_type_id is None
+
+
+def test_one_virtual_model_per_model():
+    virtual_model_factory(TypeB)
+    cache_size = virtual_model_factory.cache_info().currsize
+    loaders = [RequestsLoader() for _ in range(3)]
+
+    instances = [
+        get_model_instance(TypeB, {"url": "https://example.com/b/1"}, loader=loader)
+        for loader in loaders
+    ]
+
+    assert len({type(instance) for instance in instances}) == 1
+    assert virtual_model_factory.cache_info().currsize == cache_size
+
+
+def test_relations_use_loader_of_instance():
+    class Loader(RequestsLoader):
+        def fetch_object(self, url: str) -> dict:
+            return {"url": url, "name": self.name}
+
+    first, second = Loader(), Loader()
+    first.name, second.name = "first", "second"
+    data = {"url": "https://example.com/b/1", "a_types": ["https://example.com/a/1"]}
+
+    instance1 = get_model_instance(TypeB, data, loader=first)
+    instance2 = get_model_instance(TypeB, data, loader=second)
+
+    assert [obj.name for obj in instance1.a_types] == ["first"]
+    assert [obj.name for obj in instance2.a_types] == ["second"]